@@ -1,58 +1,158 @@
-import requests
-import pandas as pd
-import matplotlib.pyplot as plt
+import argparse
+
 import numpy as np
 
-def analyze_student_scores():
+from analysis.sources import (DEFAULT_TTL, DEFAULT_URL, DEFAULT_WORKERS, CachedHTTPSource,
+                              DataSourceError, open_source, open_sources)
+from analysis.plotting import DEFAULT_MAX_BARS, render_scores
+from analysis.stats import print_summary, summarize
+
+def analyze_student_scores(source=None, output=None, plot=True, max_bars=DEFAULT_MAX_BARS):
     """
-    Fetches student test score data from a public API, calculates the
-    average score, and visualizes the scores using a bar chart.
+    Fetches student test score data from a data source, prints summary
+    statistics (overall and per category), and visualizes the scores
+    using a bar chart.
+
+    Parameters:
+    -----------
+    source : optional
+        Any object with a ``load()`` method (see analysis.sources), a
+        URL / JSON / NDJSON / SQLite path for open_source(), or a list of
+        them loaded concurrently and analysed together
+        (default: None = the public API, cached on disk)
+    output : str, optional
+        Write the chart to this PNG/SVG file without a GUI (default: None =
+        show it in a window)
+    plot : bool, optional
+        Draw the chart at all (default: True)
+    max_bars : int, optional
+        Largest number of items drawn as one bar each; above it the chart
+        shows a histogram, top-K bars and binned averages instead
+
+    Returns:
+    --------
+    Dict or None
+        The summary from analysis.stats.summarize(), None if no data
     """
 
-    # Fetch data from API
-    url = "https://fakestoreapi.com/products"
+    # Fetch data (cached HTTP by default, so repeated runs skip the network)
+    if source is None:
+        source = CachedHTTPSource(DEFAULT_URL)
+    elif isinstance(source, str):
+        source = open_source(source)
+    elif isinstance(source, (list, tuple)):
+        source = open_sources(source)
 
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching data from API: {e}")
+        data = source.load()
+    except DataSourceError as e:
+        print(f"Error: {e}")
         return
 
     # Extract scores (using product price as score)
-    scores = [item["price"] for item in data]
+    scores = np.fromiter((item["price"] for item in data), dtype=np.float64, count=len(data))
 
-    if not scores:
+    if not scores.size:
         print("No scores found.")
         return
 
-    # Calculate average scores
-    average_score = np.mean(scores)
+    # One vectorized pass: mean, median, std, percentiles, per category
+    categories = [item.get("category", "uncategorized") for item in data]
+    summary = summarize(scores, categories)
+    print_summary(summary)
+    average_score = summary["mean"]
 
-    df = pd.DataFrame(data)
-    average_score_pd = df["price"].mean()
+    if not plot:
+        return summary
 
-    print(f"Average score using NumPy: {average_score:.2f}")
-    print(f"Average score using Pandas: {average_score_pd:.2f}")
+    # Bar chart for a few items, aggregated views for many; headless with output
+    names = [item["title"] for item in data]
+    written = render_scores(scores, names, average=average_score, output=output,
+                            max_bars=max_bars)
+    if written:
+        print(f"✓ Chart written to {written}")
+    return summary
+
+
+def analyze_student_scores_chunked(spec, chunksize=None, table="products",
+                                   **http_options):
+    """
+    Summarizes a score dump too large for memory, chunk by chunk.
 
-    # Prepare data for visualization
-    names = [item["title"][:20] + "..." for item in data]
-    values = scores
+    Only the price and category columns are read, as float32 and category
+    dtypes, and partial aggregates are merged per chunk (see
+    analysis.chunked). No chart is drawn: that would need every score.
+    ``chunksize`` defaults to analysis.chunked.DEFAULT_CHUNKSIZE.
+
+    Returns:
+    --------
+    Dict or None
+        The merged summary, None if the source could not be read
+    """
+    # Imported here: analysis.chunked loads pandas, which only this mode needs
+    from analysis.chunked import DEFAULT_CHUNKSIZE, chunked_summary
+
+    chunksize = chunksize or DEFAULT_CHUNKSIZE
+    try:
+        summary = chunked_summary(spec, chunksize=chunksize, table=table, **http_options)
+    except DataSourceError as e:
+        print(f"Error: {e}")
+        return None
+
+    if not summary["count"]:
+        print("No scores found.")
+        return None
+    print_summary(summary)
+    print(f"  ({summary['chunks']} chunks of up to {chunksize:,} rows)")
+    return summary
 
-    # Plot bar chart
-    plt.figure(figsize=(12, 7))
-    plt.bar(names, values)
-    plt.axhline(average_score, linestyle="dashed", linewidth=2, label="Average Score")
 
-    plt.xlabel("Student / Item Name")
-    plt.ylabel("Score")
-    plt.title("Student Scores Visualization")
-    plt.xticks(rotation=45, ha="right")
-    plt.legend()
-    plt.tight_layout()
-    plt.show()
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze and plot student scores")
+    parser.add_argument("--source", action="append", default=None,
+                        help="URL, JSON/NDJSON file or SQLite database; repeat to analyse "
+                             f"several sources together (default: {DEFAULT_URL})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"sources loaded concurrently (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="seconds to wait for each source; slower ones are skipped "
+                             "(default: no limit, 10s per HTTP request)")
+    parser.add_argument("--table", default="products",
+                        help="table to read from a SQLite source (default: products)")
+    parser.add_argument("--ttl", type=float, default=DEFAULT_TTL,
+                        help=f"seconds a cached HTTP response stays fresh (default: {DEFAULT_TTL})")
+    parser.add_argument("--cache-dir", default=None,
+                        help="directory for cached HTTP responses (default: ~/.cache/ai_projects)")
+    parser.add_argument("--offline", action="store_true",
+                        help="never use the network; read the HTTP cache however old")
+    parser.add_argument("--refresh", action="store_true",
+                        help="fetch again even if the HTTP cache is fresh")
+    parser.add_argument("-o", "--output", default=None,
+                        help="write the chart to this .png/.svg file (headless) instead of showing it")
+    parser.add_argument("--no-plot", action="store_true",
+                        help="print the statistics only; matplotlib is never imported")
+    parser.add_argument("--max-bars", type=int, default=DEFAULT_MAX_BARS,
+                        help=f"above this many items plot aggregated views (default: {DEFAULT_MAX_BARS})")
+    parser.add_argument("--chunked", action="store_true",
+                        help="out-of-core mode for huge NDJSON/CSV/SQLite dumps: "
+                             "bounded memory, statistics only")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="rows per chunk with --chunked (default: 100000)")
+    args = parser.parse_args(argv)
+    args.source = args.source or [DEFAULT_URL]
+    return args
 
 
 if __name__ == "__main__":
-    analyze_student_scores()
+    args = parse_args()
+    http_options = dict(ttl=args.ttl, cache_dir=args.cache_dir, offline=args.offline,
+                        refresh=args.refresh)
+    if args.chunked:
+        analyze_student_scores_chunked(args.source, chunksize=args.chunksize,
+                                       table=args.table, **http_options)
+    else:
+        analyze_student_scores(open_sources(args.source, table=args.table,
+                                            workers=args.workers, timeout=args.timeout,
+                                            **http_options),
+                               output=args.output, plot=not args.no_plot,
+                               max_bars=args.max_bars)
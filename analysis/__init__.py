@@ -0,0 +1,3 @@
+"""
+Score analysis for 2_student_info.py: data sources, statistics and plots.
+"""
@@ -0,0 +1,152 @@
+"""
+Out-of-core score analysis for dumps too large to load at once.
+
+The source is read ``chunksize`` rows at a time with pandas, keeping only
+the score and category columns, downcast as they are read (scores to
+``float32``, categories to ``category``). Each chunk is folded into a
+``RunningStats`` (analysis.stats) and then dropped, so memory is bounded
+by one chunk plus the fixed-size percentile reservoir, however many
+rows the source has.
+
+Chunked sources:
+
+- NDJSON (``.ndjson``/``.jsonl``) and CSV (``.csv``) files
+- SQLite tables (``.db``/``.sqlite``/``.sqlite3``), queried for the two
+  columns only and fetched chunk by chunk
+
+A JSON array (``.json``, or a cached HTTP response) cannot be parsed
+incrementally with pandas, so it is loaded whole and then processed in
+chunks; convert large dumps to NDJSON (``run.py export --format ndjson``).
+
+Example:
+--------
+>>> summary = chunked_summary("scores.ndjson", chunksize=200_000)
+"""
+
+import sqlite3
+from typing import Dict, Iterator, Sequence, Union
+
+import pandas as pd
+
+from analysis.sources import (SQLITE_SUFFIXES, CachedHTTPSource, DataSourceError,
+                              open_source)
+from analysis.stats import DEFAULT_PERCENTILES, RunningStats
+
+# Rows read per chunk
+DEFAULT_CHUNKSIZE = 100_000
+
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+
+
+def _downcast(chunk: pd.DataFrame, value_column: str, category_column: str) -> pd.DataFrame:
+    """Keep the two analysed columns, as float32 and category."""
+    columns = {value_column: pd.to_numeric(chunk[value_column], errors="coerce")
+                                .astype("float32")}
+    if category_column in chunk:
+        columns[category_column] = chunk[category_column].astype("category")
+    return pd.DataFrame(columns).dropna(subset=[value_column])
+
+
+def _read_chunks(spec: str, chunksize: int, table: str, value_column: str,
+                 category_column: str, **http_options) -> Iterator[pd.DataFrame]:
+    lower = spec.lower()
+    if lower.endswith(".csv"):
+        header = pd.read_csv(spec, nrows=0).columns
+        usecols = [c for c in (value_column, category_column) if c in header]
+        yield from pd.read_csv(spec, usecols=usecols, chunksize=chunksize,
+                               dtype={value_column: "float32", category_column: "category"})
+    elif lower.endswith(NDJSON_SUFFIXES):
+        with pd.read_json(spec, lines=True, chunksize=chunksize, dtype=False) as reader:
+            yield from reader
+    elif lower.endswith(SQLITE_SUFFIXES):
+        quote = lambda name: '"' + name.replace('"', '""') + '"'
+        conn = sqlite3.connect(f"file:{spec}?mode=ro", uri=True)
+        try:
+            columns = {row[1] for row in conn.execute(f"PRAGMA table_info({quote(table)})")}
+            if value_column not in columns:
+                raise DataSourceError(f"Table {table} has no column {value_column}")
+            selected = [c for c in (value_column, category_column) if c in columns]
+            query = f"SELECT {', '.join(map(quote, selected))} FROM {quote(table)}"
+            yield from pd.read_sql_query(query, conn, chunksize=chunksize)
+        finally:
+            conn.close()
+    else:
+        source = open_source(spec, table=table, **http_options)
+        if isinstance(source, CachedHTTPSource):
+            # Make sure the cache is filled, then parse it like a local file
+            source.load()
+            spec = source.cache_path
+        frame = pd.read_json(spec, dtype=False)
+        for start in range(0, len(frame), chunksize):
+            yield frame.iloc[start:start + chunksize]
+
+
+def iter_score_chunks(spec: str, chunksize: int = DEFAULT_CHUNKSIZE, table: str = "products",
+                      value_column: str = "price", category_column: str = "category",
+                      **http_options) -> Iterator[pd.DataFrame]:
+    """
+    Yield the source as DataFrames of at most ``chunksize`` rows.
+
+    Each chunk has a float32 ``value_column`` (rows without a numeric
+    score dropped) and, if the source has one, a category-dtype
+    ``category_column``.
+
+    Parameters:
+    -----------
+    spec : str
+        NDJSON/CSV/JSON file, SQLite database or URL (see analysis.sources)
+    chunksize : int, optional
+        Rows per chunk (default: DEFAULT_CHUNKSIZE)
+    table : str, optional
+        Table read from a SQLite database (default: 'products')
+    value_column, category_column : str, optional
+        Score and category columns (default: 'price', 'category')
+    **http_options
+        Passed to CachedHTTPSource for URLs
+    """
+    try:
+        for chunk in _read_chunks(spec, chunksize, table, value_column, category_column,
+                                  **http_options):
+            if value_column not in chunk:
+                raise DataSourceError(f"{spec} has no column {value_column}")
+            yield _downcast(chunk, value_column, category_column)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        raise DataSourceError(f"Cannot read {spec}: {e}") from e
+
+
+def chunked_summary(spec: Union[str, Sequence[str]], chunksize: int = DEFAULT_CHUNKSIZE,
+                    table: str = "products", value_column: str = "price",
+                    category_column: str = "category",
+                    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+                    **http_options) -> Dict:
+    """
+    Summarize a source chunk by chunk in bounded memory.
+
+    Parameters:
+    -----------
+    spec : str or sequence of str
+        Source to read, see iter_score_chunks(); several sources are read
+        one after the other into the same summary
+    chunksize : int, optional
+        Rows per chunk (default: DEFAULT_CHUNKSIZE)
+    percentiles : sequence of float, optional
+        Percentiles to report (default: DEFAULT_PERCENTILES)
+
+    Returns:
+    --------
+    Dict
+        The RunningStats summary (see analysis.stats), plus ``chunks``
+    """
+    stats = RunningStats(percentiles=percentiles)
+    chunks = 0
+    # Sequential on purpose: reading sources concurrently would multiply
+    # the memory bound by the number of sources
+    for one_spec in ([spec] if isinstance(spec, str) else spec):
+        for chunk in iter_score_chunks(one_spec, chunksize, table, value_column,
+                                       category_column, **http_options):
+            categories = chunk[category_column].array if category_column in chunk else None
+            stats.update(chunk[value_column].to_numpy(), categories)
+            chunks += 1
+    summary = stats.summary()
+    summary["chunks"] = chunks
+    return summary
@@ -0,0 +1,351 @@
+"""
+Pluggable data sources for the score analysis (2_student_info.py).
+
+Every source has a ``load()`` method that returns a list of record
+dictionaries shaped like the fakestoreapi.com products (``price``,
+``title``, ``category``, ...):
+
+- ``JSONFileSource``     a local JSON array or NDJSON file
+- ``SQLiteSource``       a table of a SQLite database
+- ``CachedHTTPSource``   an HTTP endpoint, cached on disk for ``ttl`` seconds
+- ``MultiSource``        several of the above, loaded concurrently
+
+The HTTP source only touches the network when its cache is missing or
+expired, and falls back to a stale copy when the fetch fails, so after
+one successful run the analysis works offline. ``open_source()`` builds
+the right source from a command-line string.
+
+Example:
+--------
+>>> records = open_source("products.ndjson").load()
+>>> records = open_source("https://fakestoreapi.com/products", ttl=3600).load()
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Sequence
+
+# The endpoint 2_student_info.py has always analysed
+DEFAULT_URL = "https://fakestoreapi.com/products"
+
+# Cached HTTP responses live here unless a cache_dir is given
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ai_projects")
+
+# Seconds a cached HTTP response is considered fresh
+DEFAULT_TTL = 24 * 3600
+
+DEFAULT_TIMEOUT = 10
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+# Sources loaded at once by MultiSource
+DEFAULT_WORKERS = 8
+
+# How often MultiSource checks whether a queued source has started (seconds)
+QUEUE_POLL_INTERVAL = 0.05
+
+
+class DataSourceError(Exception):
+    """Raised when a source cannot produce any records."""
+
+
+class JSONFileSource:
+    """
+    Records from a local file: a JSON array or one JSON object per line.
+
+    Parameters:
+    -----------
+    path : str
+        ``.json`` file holding an array, or ``.ndjson``/``.jsonl`` file
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> List[Dict]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                text = f.read()
+        except OSError as e:
+            raise DataSourceError(f"Cannot read {self.path}: {e}") from e
+
+        try:
+            # A JSON array parses in one go; anything else is NDJSON
+            if text.lstrip().startswith("["):
+                return json.loads(text)
+            return [json.loads(line) for line in text.splitlines() if line.strip()]
+        except json.JSONDecodeError as e:
+            raise DataSourceError(f"Invalid JSON in {self.path}: {e}") from e
+
+    def __repr__(self):
+        return f"JSONFileSource({self.path!r})"
+
+
+class SQLiteSource:
+    """
+    Records from a SQLite table, one dictionary per row.
+
+    Parameters:
+    -----------
+    db_path : str
+        SQLite database file
+    table : str, optional
+        Table to read (default: 'products')
+    """
+
+    def __init__(self, db_path: str, table: str = "products"):
+        self.db_path = db_path
+        self.table = table
+
+    def load(self) -> List[Dict]:
+        if not os.path.exists(self.db_path):
+            raise DataSourceError(f"Database not found: {self.db_path}")
+        quoted = '"' + self.table.replace('"', '""') + '"'
+        # Read-only: analysing a table must never modify it
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        try:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(f"SELECT * FROM {quoted}").fetchall()
+        except sqlite3.Error as e:
+            raise DataSourceError(f"Cannot read table {self.table}: {e}") from e
+        finally:
+            conn.close()
+        return [dict(row) for row in rows]
+
+    def __repr__(self):
+        return f"SQLiteSource({self.db_path!r}, table={self.table!r})"
+
+
+class CachedHTTPSource:
+    """
+    Records from an HTTP JSON endpoint, cached on disk.
+
+    Parameters:
+    -----------
+    url : str
+        Endpoint returning a JSON array
+    cache_dir : str, optional
+        Directory for cached responses (default: DEFAULT_CACHE_DIR)
+    ttl : float, optional
+        Seconds a cached response stays fresh (default: DEFAULT_TTL)
+    timeout : float, optional
+        HTTP timeout in seconds (default: DEFAULT_TIMEOUT)
+    offline : bool, optional
+        Never use the network; only the cache, however old (default: False)
+    refresh : bool, optional
+        Ignore a fresh cache and fetch again (default: False)
+    """
+
+    def __init__(self, url: str = DEFAULT_URL, cache_dir: str = None,
+                 ttl: float = DEFAULT_TTL, timeout: float = DEFAULT_TIMEOUT,
+                 offline: bool = False, refresh: bool = False):
+        self.url = url
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.ttl = ttl
+        self.timeout = timeout
+        self.offline = offline
+        self.refresh = refresh
+
+    @property
+    def cache_path(self) -> str:
+        key = hashlib.sha256(self.url.encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"http-{key}.json")
+
+    def cache_age(self) -> Optional[float]:
+        """Seconds since the cache was written, or None if there is none."""
+        try:
+            return time.time() - os.path.getmtime(self.cache_path)
+        except OSError:
+            return None
+
+    def _read_cache(self) -> List[Dict]:
+        return JSONFileSource(self.cache_path).load()
+
+    def _write_cache(self, body: bytes):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Write then rename so a crash never leaves a truncated cache
+        tmp = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(body)
+        os.replace(tmp, self.cache_path)
+
+    def _fetch(self) -> List[Dict]:
+        import requests
+
+        try:
+            response = requests.get(self.url, timeout=self.timeout)
+            response.raise_for_status()
+            records = response.json()
+        except (requests.RequestException, ValueError) as e:
+            raise DataSourceError(f"Error fetching data from {self.url}: {e}") from e
+        self._write_cache(response.content)
+        return records
+
+    def load(self) -> List[Dict]:
+        age = self.cache_age()
+        if age is not None and (self.offline or (not self.refresh and age < self.ttl)):
+            return self._read_cache()
+        if self.offline:
+            raise DataSourceError(f"Offline and no cached copy of {self.url}")
+
+        try:
+            return self._fetch()
+        except DataSourceError as e:
+            if age is None:
+                raise
+            # A stale copy beats no data at all
+            print(f"✗ {e}; using cached copy from {age / 3600:.1f}h ago")
+            return self._read_cache()
+
+    def __repr__(self):
+        return f"CachedHTTPSource({self.url!r}, ttl={self.ttl})"
+
+
+class MultiSource:
+    """
+    Records from several sources, loaded concurrently and concatenated.
+
+    Loading is I/O-bound (HTTP, disk, SQLite release the GIL), so a small
+    thread pool makes the total wall time close to that of the slowest
+    source instead of the sum of all of them. Records are concatenated in
+    the order the sources were given. A source that fails or times out
+    is reported and skipped; only if every source fails is
+    DataSourceError raised.
+
+    Parameters:
+    -----------
+    sources : sequence
+        Source objects (anything with ``load()``)
+    workers : int, optional
+        Sources loaded at once (default: DEFAULT_WORKERS)
+    timeout : float, optional
+        Seconds to wait for each source, counted from when that source
+        starts loading (default: None = no limit). A source still running
+        past it is skipped. Sources still queued when every worker is held
+        by such a straggler are cancelled and reported as timed out too.
+
+    A skipped source's thread keeps running in the background, and the
+    interpreter waits for pool threads at exit, so a source that hangs
+    still delays exit until it returns (HTTP sources are bounded by their
+    own request timeout).
+    """
+
+    def __init__(self, sources: Sequence, workers: int = DEFAULT_WORKERS,
+                 timeout: Optional[float] = None):
+        self.sources = list(sources)
+        self.workers = workers
+        self.timeout = timeout
+        # (source, record count or None, seconds, error) of the last load()
+        self.report: List[tuple] = []
+
+    @staticmethod
+    def _timed_load(source, started: Dict, i: int):
+        start = started[i] = time.monotonic()
+        records = source.load()
+        return records, time.monotonic() - start
+
+    def _wait(self, futures: List, started: Dict, workers: int):
+        """Wait until every source has finished or run past its own timeout."""
+        if self.timeout is None:
+            wait(futures)
+            return
+        while True:
+            now = time.monotonic()
+            pending = [i for i, f in enumerate(futures) if not f.done()]
+            running = [i for i in pending if i in started]
+            expired = [i for i in running if now - started[i] >= self.timeout]
+            live = [i for i in running if i not in expired]
+            queued = [i for i in pending if i not in started]
+            # Queued sources can only start once a worker is free
+            if not live and (not queued or len(expired) >= workers):
+                return
+            deadline = min((started[i] + self.timeout for i in live), default=None)
+            # A queued source's clock starts when a worker picks it up, so poll for that
+            delay = QUEUE_POLL_INTERVAL if queued else deadline - now
+            if deadline is not None:
+                delay = min(delay, deadline - now)
+            wait([futures[i] for i in pending], timeout=max(0.0, delay),
+                 return_when=FIRST_COMPLETED)
+
+    def load(self) -> List[Dict]:
+        workers = max(1, min(self.workers, len(self.sources)))
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="score-source")
+        started = {}
+        try:
+            futures = [executor.submit(self._timed_load, source, started, i)
+                       for i, source in enumerate(self.sources)]
+            self._wait(futures, started, workers)
+        finally:
+            # Do not block on stragglers past the timeout; drop queued sources
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        records, self.report = [], []
+        for source, future in zip(self.sources, futures):
+            if future.cancelled() or not future.done():
+                self.report.append((source, None, self.timeout, "timed out"))
+                continue
+            try:
+                loaded, seconds = future.result()
+            except Exception as e:
+                self.report.append((source, None, None, str(e) or type(e).__name__))
+                continue
+            records.extend(loaded)
+            self.report.append((source, len(loaded), seconds, None))
+
+        for source, count, seconds, error in self.report:
+            if error:
+                print(f"✗ {source}: {error}")
+            else:
+                print(f"✓ {source}: {count} records in {seconds:.2f}s")
+        if all(error for *_, error in self.report):
+            raise DataSourceError(f"All {len(self.sources)} sources failed")
+        return records
+
+    def __repr__(self):
+        return f"MultiSource({len(self.sources)} sources, workers={self.workers})"
+
+
+def open_source(spec: str = DEFAULT_URL, table: str = "products", **http_options):
+    """
+    Build a data source from a string.
+
+    Parameters:
+    -----------
+    spec : str
+        ``http(s)://...`` URL, SQLite file (``.db``/``.sqlite``/``.sqlite3``)
+        or JSON/NDJSON file
+    table : str, optional
+        Table read from a SQLite file (default: 'products')
+    **http_options
+        Passed to CachedHTTPSource (cache_dir, ttl, timeout, offline, refresh)
+
+    Returns:
+    --------
+    JSONFileSource, SQLiteSource or CachedHTTPSource
+    """
+    if spec.startswith(("http://", "https://")):
+        return CachedHTTPSource(spec, **http_options)
+    if spec.lower().endswith(SQLITE_SUFFIXES):
+        return SQLiteSource(spec, table=table)
+    return JSONFileSource(spec)
+
+
+def open_sources(specs: Sequence[str], table: str = "products", workers: int = DEFAULT_WORKERS,
+                 timeout: Optional[float] = None, **http_options):
+    """
+    Build one source from several strings (see open_source()).
+
+    A single spec gives that source itself; several give a MultiSource
+    that loads them concurrently. ``timeout`` also becomes the HTTP
+    timeout of URL sources.
+    """
+    if timeout is not None:
+        http_options.setdefault("timeout", timeout)
+    sources = [open_source(spec, table=table, **http_options) for spec in specs]
+    if len(sources) == 1:
+        return sources[0]
+    return MultiSource(sources, workers=workers, timeout=timeout)
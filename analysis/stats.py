@@ -0,0 +1,283 @@
+"""
+Summary statistics for score analysis.
+
+``summarize()`` computes the whole summary (count, mean, median, std,
+min/max, percentiles and a per-category breakdown) from one NumPy array:
+the values are sorted once, so min, max, median and every percentile are
+read from the sorted array, and the per-category figures come from
+``np.bincount`` / ``np.minimum.reduceat`` instead of a Python loop.
+
+``RunningStats`` produces the same summary from batches when the input
+does not fit in memory. Mean and variance use Welford's update, merged
+per batch with Chan's formula, so they match ``summarize()`` exactly
+(up to rounding). Median and percentiles come from a fixed-size
+uniform reservoir sample and are approximate once more values than
+``reservoir_size`` have been seen (``summary["approximate"]``).
+
+The standard deviation is the population one (ddof=0, like ``np.std``).
+
+Example:
+--------
+>>> summary = summarize([10.5, 22.0, 7.95], categories=["a", "b", "a"])
+>>> summary["mean"], summary["by_category"]["a"]["count"]
+"""
+
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Values kept by RunningStats for approximate median / percentiles
+DEFAULT_RESERVOIR_SIZE = 100_000
+
+
+def _percentiles_from_sorted(sorted_values: np.ndarray, percentiles: Sequence[float]) -> Dict:
+    # Linear interpolation between closest ranks, as np.percentile does
+    n = len(sorted_values)
+    positions = np.asarray(percentiles, dtype=np.float64) / 100 * (n - 1)
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.minimum(lower + 1, n - 1)
+    weight = positions - lower
+    result = sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+    return {p: float(v) for p, v in zip(percentiles, result)}
+
+
+def _empty_summary(percentiles: Sequence[float]) -> Dict:
+    nan = float("nan")
+    return {"count": 0, "mean": nan, "median": nan, "std": nan, "min": nan, "max": nan,
+            "percentiles": {p: nan for p in percentiles}, "by_category": {}}
+
+
+def _category_breakdown(values: np.ndarray, categories) -> Dict:
+    if hasattr(categories, "codes") and hasattr(categories, "categories"):
+        # pandas Categorical: group on the integer codes, skipping missing (-1)
+        codes = np.asarray(categories.codes)
+        valid = codes >= 0
+        used, inverse = np.unique(codes[valid], return_inverse=True)
+        values = values[valid]
+        labels = np.asarray(categories.categories, dtype=object)[used].astype(str)
+        if not values.size:
+            return {}
+    else:
+        labels, inverse = np.unique(np.asarray(categories, dtype=object).astype(str),
+                                    return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(labels))
+    means = np.bincount(inverse, weights=values, minlength=len(labels)) / counts
+    # Centered second moment: stabler than sum(x^2) - n*mean^2
+    deviations = values - means[inverse]
+    stds = np.sqrt(np.bincount(inverse, weights=deviations * deviations,
+                               minlength=len(labels)) / counts)
+
+    # Group the values by category once to get per-category min / max
+    order = np.argsort(inverse, kind="stable")
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    grouped = values[order]
+    mins = np.minimum.reduceat(grouped, starts)
+    maxs = np.maximum.reduceat(grouped, starts)
+
+    return {
+        str(label): {"count": int(c), "mean": float(m), "std": float(s),
+                     "min": float(lo), "max": float(hi)}
+        for label, c, m, s, lo, hi in zip(labels, counts, means, stds, mins, maxs)
+    }
+
+
+def summarize(values, categories: Optional[Sequence] = None,
+              percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict:
+    """
+    Compute the full summary of ``values`` in one vectorized pass.
+
+    Parameters:
+    -----------
+    values : array-like of float
+        The scores
+    categories : sequence, optional
+        One label per value for the per-category breakdown (a pandas
+        Categorical is grouped on its codes; missing labels are skipped)
+    percentiles : sequence of float, optional
+        Percentiles to report, in [0, 100] (default: DEFAULT_PERCENTILES)
+
+    Returns:
+    --------
+    Dict
+        count, mean, median, std, min, max, percentiles {p: value} and
+        by_category {label: {count, mean, std, min, max}}
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.size == 0:
+        return _empty_summary(percentiles)
+
+    sorted_values = np.sort(values)
+    mean = float(values.mean())
+    deviations = values - mean
+    summary = {
+        "count": int(values.size),
+        "mean": mean,
+        "median": _percentiles_from_sorted(sorted_values, (50,))[50],
+        "std": float(np.sqrt(np.dot(deviations, deviations) / values.size)),
+        "min": float(sorted_values[0]),
+        "max": float(sorted_values[-1]),
+        "percentiles": _percentiles_from_sorted(sorted_values, percentiles),
+        "by_category": {},
+    }
+    if categories is not None:
+        if len(categories) != values.size:
+            raise ValueError("categories must have one label per value")
+        summary["by_category"] = _category_breakdown(values, categories)
+    return summary
+
+
+class RunningStats:
+    """
+    Streaming summary over batches of values (Welford / Chan).
+
+    Parameters:
+    -----------
+    percentiles : sequence of float, optional
+        Percentiles to report (default: DEFAULT_PERCENTILES)
+    reservoir_size : int, optional
+        Values sampled for median / percentiles (default: DEFAULT_RESERVOIR_SIZE)
+    seed : int, optional
+        Seed of the reservoir sampler, for repeatable results (default: 0)
+    """
+
+    def __init__(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+                 reservoir_size: int = DEFAULT_RESERVOIR_SIZE, seed: int = 0):
+        self.percentiles = tuple(percentiles)
+        self.reservoir_size = reservoir_size
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+        # label -> [count, mean, m2, min, max]
+        self._categories: Dict[str, list] = {}
+        self._reservoir = np.empty(reservoir_size, dtype=np.float64)
+        self._rng = np.random.default_rng(seed)
+
+    @staticmethod
+    def _merge(count, mean, m2, b_count, b_mean, b_m2) -> Tuple[int, float, float]:
+        # Chan et al.: combine two (count, mean, M2) partial results
+        total = count + b_count
+        delta = b_mean - mean
+        mean += delta * b_count / total
+        m2 += b_m2 + delta * delta * count * b_count / total
+        return total, mean, m2
+
+    def _sample(self, values: np.ndarray):
+        # Algorithm R, vectorized over the batch: item i (0-based, overall)
+        # replaces a random slot with probability reservoir_size / (i + 1)
+        size, seen = self.reservoir_size, self.count
+        fill = max(0, min(size - seen, len(values)))
+        if fill:
+            self._reservoir[seen:seen + fill] = values[:fill]
+        rest = values[fill:]
+        if len(rest):
+            positions = np.arange(seen + fill, seen + len(values), dtype=np.int64)
+            slots = self._rng.integers(0, positions + 1)
+            keep = slots < size
+            self._reservoir[slots[keep]] = rest[keep]
+
+    def update(self, values, categories: Optional[Sequence] = None) -> "RunningStats":
+        """
+        Add a batch of values (and optionally their category labels).
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if values.size == 0:
+            return self
+
+        self._sample(values)
+        batch_mean = float(values.mean())
+        deviations = values - batch_mean
+        self.count, self.mean, self.m2 = self._merge(
+            self.count, self.mean, self.m2,
+            values.size, batch_mean, float(np.dot(deviations, deviations)))
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+        if categories is not None:
+            if len(categories) != values.size:
+                raise ValueError("categories must have one label per value")
+            for label, part in _category_breakdown(values, categories).items():
+                current = self._categories.get(label)
+                b_m2 = part["std"] ** 2 * part["count"]
+                if current is None:
+                    self._categories[label] = [part["count"], part["mean"], b_m2,
+                                               part["min"], part["max"]]
+                    continue
+                current[0], current[1], current[2] = self._merge(
+                    current[0], current[1], current[2], part["count"], part["mean"], b_m2)
+                current[3] = min(current[3], part["min"])
+                current[4] = max(current[4], part["max"])
+        return self
+
+    def summary(self) -> Dict:
+        """
+        Return the summary in the same shape as summarize().
+
+        ``approximate`` is True when median / percentiles come from a
+        sample rather than every value.
+        """
+        if self.count == 0:
+            summary = _empty_summary(self.percentiles)
+            summary["approximate"] = False
+            return summary
+
+        sample = np.sort(self._reservoir[:min(self.count, self.reservoir_size)])
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "median": _percentiles_from_sorted(sample, (50,))[50],
+            "std": float(np.sqrt(self.m2 / self.count)),
+            "min": self.min,
+            "max": self.max,
+            "percentiles": _percentiles_from_sorted(sample, self.percentiles),
+            "by_category": {
+                label: {"count": c, "mean": m, "std": float(np.sqrt(m2 / c)),
+                        "min": lo, "max": hi}
+                for label, (c, m, m2, lo, hi) in sorted(self._categories.items())
+            },
+            "approximate": self.count > self.reservoir_size,
+        }
+
+
+def stream_summary(batches: Iterable, percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+                   reservoir_size: int = DEFAULT_RESERVOIR_SIZE) -> Dict:
+    """
+    Summarize an iterable of batches without holding them all in memory.
+
+    Parameters:
+    -----------
+    batches : iterable
+        Arrays of values, or (values, categories) pairs
+
+    Returns:
+    --------
+    Dict
+        See RunningStats.summary()
+    """
+    stats = RunningStats(percentiles=percentiles, reservoir_size=reservoir_size)
+    for batch in batches:
+        if isinstance(batch, tuple):
+            stats.update(*batch)
+        else:
+            stats.update(batch)
+    return stats.summary()
+
+
+def print_summary(summary: Dict, label: str = "Score"):
+    """Print a summary produced by summarize() or RunningStats."""
+    approx = " (approx.)" if summary.get("approximate") else ""
+    print(f"{label} summary over {summary['count']} values:")
+    print(f"  mean {summary['mean']:.2f}   median {summary['median']:.2f}{approx}"
+          f"   std {summary['std']:.2f}")
+    print(f"  min {summary['min']:.2f}   max {summary['max']:.2f}")
+    print("  percentiles" + approx + ": " + ", ".join(
+        f"p{p:g}={v:.2f}" for p, v in summary["percentiles"].items()))
+    if summary["by_category"]:
+        print("  by category:")
+        width = max(len(c) for c in summary["by_category"])
+        for name, cat in summary["by_category"].items():
+            print(f"    {name:<{width}}  n={cat['count']:<6} mean={cat['mean']:.2f}"
+                  f"  std={cat['std']:.2f}  min={cat['min']:.2f}  max={cat['max']:.2f}")
@@ -0,0 +1,27 @@
+"""
+Books API: Flask (api.server) and ASGI (api.asgi) apps over one catalog.
+
+Attributes are resolved lazily so ``import api`` does not import Flask;
+``from api import app`` loads api.server on first access.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "app": "api.server",
+    "run_server": "api.server",
+    "start_server_thread": "api.server",
+    "generate_books": "api.catalog",
+    "get_books": "api.catalog",
+    "set_books": "api.catalog",
+    "find_book": "api.catalog",
+    "similar_books": "api.similar",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
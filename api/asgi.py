@@ -0,0 +1,428 @@
+"""
+Async (ASGI) version of the Books API.
+
+Serves the same ``/``, ``/books``, ``/books/<id>``, ``/books/<id>/similar``
+and ``/metrics`` contract as the Flask app in api.server, but on an event loop: one
+process keeps thousands of keep-alive connections open on a single
+thread, and a slow reader only holds a suspended coroutine instead of a
+worker thread.
+
+- ``/books`` is streamed in chunks of ``chunk_rows`` books, so a large
+  catalog is never encoded into one giant response body and each chunk
+  waits for the client to drain the previous one.
+- When the app serves a SQLite database (``db_path``), every query runs
+  in a small thread pool so the event loop never blocks on disk I/O.
+- ``/books/<id>/similar`` searches the similarity index in a thread too;
+  for a database that is the memory-mapped index ``run.py sync --index``
+  keeps next to it, reloaded when a sync updates it.
+
+The app itself only uses the standard library; serving it needs an ASGI
+server such as uvicorn (``pip install uvicorn``).
+
+Usage:
+    python run.py serve --asgi                  # generated catalog
+    python run.py serve --asgi --db books.db    # books stored by `run.py sync`
+"""
+
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional
+from urllib.parse import parse_qs
+
+from api import catalog
+from api.fragments import CACHE, Projection, encode_books, encode_book, encode_json, parse_fields
+from services import metrics
+
+# Books encoded per streamed chunk of the /books response
+DEFAULT_CHUNK_ROWS = 1000
+
+# Threads available for SQLite queries
+DEFAULT_DB_THREADS = 4
+
+BOOK_ROUTE = re.compile(r"^/books/(\d+)$")
+SIMILAR_ROUTE = re.compile(r"^/books/(\d+)/similar$")
+
+
+# =============================================================================
+# BOOK SOURCES
+# =============================================================================
+
+def database_stamp(db_path: str):
+    """
+    Size and modification time of a SQLite database and its WAL file.
+
+    Any commit changes one of them, so an unchanged stamp means there is
+    nothing new to check, for the price of two stat() calls.
+    """
+    stamp = []
+    for file_path in (db_path, db_path + "-wal"):
+        try:
+            st = os.stat(file_path)
+            stamp.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+class MemoryBooks:
+    """
+    Serves the in-memory catalog from api.catalog (the Flask app's data).
+    """
+
+    async def get(self, book_id: int) -> Optional[Dict]:
+        return catalog.find_book(book_id)
+
+    async def similar(self, book_id: int, k: int) -> Optional[List[Dict]]:
+        from api import similar
+        # Matrix products release the GIL, so a thread keeps the loop free
+        return await asyncio.to_thread(similar.similar_books, book_id, k)
+
+    async def chunks(self, chunk_rows: int) -> AsyncIterator[List[Dict]]:
+        books = catalog.get_books()
+        for start in range(0, len(books), chunk_rows):
+            yield books[start:start + chunk_rows]
+
+    def encode_one(self, book: Dict, fields: Projection) -> bytes:
+        # Catalog books are immutable, so their encoded bytes are cached
+        return CACHE.fragment(book, fields)
+
+    def encode_many(self, books: List[Dict], fields: Projection) -> bytes:
+        return CACHE.join(books, fields)
+
+    def close(self):
+        pass
+
+
+class SqliteBooks:
+    """
+    Serves the ``books`` table of a SQLite database without blocking the loop.
+
+    Every query is dispatched to a dedicated thread pool. Point lookups use
+    one connection per pool thread; each streamed /books response opens its
+    own connection so a slow client never holds a lookup connection.
+
+    Parameters:
+    -----------
+    db_path : str
+        Path of the SQLite database written by store_books()
+    threads : int, optional
+        Size of the query thread pool (default: DEFAULT_DB_THREADS)
+    """
+
+    def __init__(self, db_path: str, threads: int = DEFAULT_DB_THREADS):
+        self.db_path = db_path
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="books-db")
+        self._local = threading.local()
+        self._index = None
+        self._index_version = None
+        # database_stamp() of the last check of the index against the table
+        self._index_stamp = None
+        self._index_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Read-only URI so the API can never modify the synced data
+        return sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _lookup(self, book_id: int) -> Optional[Dict]:
+        conn = self._conn()
+        with metrics.db_call("asgi_get_book") as call:
+            row = conn.execute(
+                'SELECT id, title, author, publication_year FROM books WHERE id = ?', (book_id,)
+            ).fetchone()
+            call.rows = 1 if row else 0
+        return dict(zip(catalog.BOOK_FIELDS, row)) if row else None
+
+    def _similarity_index(self, conn: sqlite3.Connection):
+        """
+        The index ``sync --index`` keeps next to the database, memory-mapped
+        read-only and reopened when a sync changes it. Without one, or if it
+        belongs to an older copy of the database, an in-memory index is built
+        from the table and topped up with new rows; it has no cluster index,
+        so its queries scan every row.
+
+        The full check against the table (a count over every indexed row)
+        only runs when the index is (re)opened. Afterwards the table is only
+        looked at when the database files change, with two rowid lookups
+        (similarity.quick_matches_database) and a top-up of the rows above
+        the index's highest ID.
+        """
+        from services import similarity
+
+        path = similarity.index_path(self.db_path)
+        version = similarity.index_version(path)
+        stamp = database_stamp(self.db_path)
+        with self._index_lock:
+            if self._index is None or version != self._index_version:
+                try:
+                    stored = similarity.SimilarityIndex.open(path, writable=False)
+                except FileNotFoundError:
+                    # No index, or one in an older layout
+                    stored = None
+                if stored is not None and not similarity.matches_database(stored, conn):
+                    stored = None
+                self._index = stored if stored is not None else similarity.SimilarityIndex()
+                self._index_version = version
+                self._index_stamp = None
+            if stamp != self._index_stamp:
+                if not similarity.quick_matches_database(self._index, conn):
+                    # The table was rebuilt underneath the index
+                    self._index = similarity.SimilarityIndex()
+                if self._index.writable:
+                    similarity.add_sqlite_rows(self._index, conn, verify=False)
+                self._index_stamp = stamp
+            return self._index
+
+    def _similar(self, book_id: int, k: int) -> Optional[List[Dict]]:
+        from api.similar import with_scores
+
+        book = self._lookup(book_id)
+        if book is None:
+            return None
+        conn = self._conn()
+        # A book newer than the stored index is vectorized on the fly
+        results = self._similarity_index(conn).similar(book_id, k, book=book)
+        if not results:
+            return []
+        with metrics.db_call("asgi_similar_books") as call:
+            rows = conn.execute(
+                'SELECT id, title, author, publication_year FROM books WHERE id IN '
+                f'({",".join("?" * len(results))})', [i for i, _ in results]).fetchall()
+            call.rows = len(rows)
+        return with_scores({row[0]: dict(zip(catalog.BOOK_FIELDS, row)) for row in rows},
+                           results)
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def get(self, book_id: int) -> Optional[Dict]:
+        return await self._run(self._lookup, book_id)
+
+    async def similar(self, book_id: int, k: int) -> Optional[List[Dict]]:
+        return await self._run(self._similar, book_id, k)
+
+    async def chunks(self, chunk_rows: int) -> AsyncIterator[List[Dict]]:
+        conn = await self._run(self._connect)
+        try:
+            cursor = await self._run(
+                conn.execute, 'SELECT id, title, author, publication_year FROM books ORDER BY id')
+            while True:
+                with metrics.db_call("asgi_stream_books") as call:
+                    rows = await self._run(cursor.fetchmany, chunk_rows)
+                    call.rows = len(rows)
+                if not rows:
+                    break
+                yield [dict(zip(catalog.BOOK_FIELDS, row)) for row in rows]
+        finally:
+            await self._run(conn.close)
+
+    # Rows can change underneath the app, so database books are not cached
+    def encode_one(self, book: Dict, fields: Projection) -> bytes:
+        return encode_book(book, fields)
+
+    def encode_many(self, books: List[Dict], fields: Projection) -> bytes:
+        return encode_books(books, fields)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+# =============================================================================
+# ASGI APPLICATION
+# =============================================================================
+
+HOME_PAYLOAD = {
+    "message": "Welcome to the Books API",
+    "endpoints": {
+        "/books": "Get all books (optional ?fields=id,title,...)",
+        "/books/<id>": "Get a specific book by ID (optional ?fields=...)",
+        "/books/<id>/similar": "Books with similar titles (optional ?k=10)",
+        "/metrics": "Prometheus metrics"
+    }
+}
+
+
+async def send_body(send, status: int, body: bytes, content_type: bytes = b"application/json"):
+    """Send a complete (non-streamed) response."""
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", content_type),
+                    (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class BooksASGIApp:
+    """
+    ASGI 3 application implementing the Books API contract.
+
+    Parameters:
+    -----------
+    db_path : str, optional
+        Serve books from this SQLite database instead of the in-memory
+        catalog (default: None = in-memory catalog)
+    chunk_rows : int, optional
+        Books per streamed /books chunk (default: DEFAULT_CHUNK_ROWS)
+    """
+
+    def __init__(self, db_path: str = None, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        self.books = SqliteBooks(db_path) if db_path else MemoryBooks()
+        self.chunk_rows = chunk_rows
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        start = time.perf_counter()
+        route, status = await self._dispatch(scope, send)
+        metrics.record_http_request(route, scope["method"], status, time.perf_counter() - start)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.books.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _dispatch(self, scope, send):
+        """Route one request; returns (route label, status) for metrics."""
+        path = scope["path"]
+        if scope["method"] not in ("GET", "HEAD"):
+            await send_body(send, 405, encode_json({"error": "Method not allowed"}))
+            return "<unmatched>", 405
+
+        if path == "/":
+            await send_body(send, 200, encode_json(HOME_PAYLOAD))
+            return "/", 200
+
+        similar_match = SIMILAR_ROUTE.match(path)
+        if similar_match:
+            return await self._similar(send, int(similar_match.group(1)), scope)
+
+        match = BOOK_ROUTE.match(path)
+        if path == "/books" or match:
+            route = "/books/<int:book_id>" if match else "/books"
+            try:
+                fields = parse_fields(self._query_param(scope, "fields"))
+            except ValueError as e:
+                await send_body(send, 400, encode_json({"error": str(e)}))
+                return route, 400
+
+            if not match:
+                await self._stream_books(send, fields)
+                return route, 200
+
+            book = await self.books.get(int(match.group(1)))
+            if book:
+                await send_body(send, 200, self.books.encode_one(book, fields))
+                return route, 200
+            await send_body(send, 404, encode_json({"error": "Book not found"}))
+            return route, 404
+
+        if path == "/metrics":
+            await send_body(send, 200, metrics.render_prometheus().encode(),
+                            b"text/plain; version=0.0.4")
+            return "/metrics", 200
+
+        await send_body(send, 404, encode_json({"error": "Not found"}))
+        return "<unmatched>", 404
+
+    async def _similar(self, send, book_id: int, scope):
+        route = "/books/<int:book_id>/similar"
+        # Imported on first use: the vector index needs NumPy
+        from api.similar import parse_k
+
+        try:
+            k = parse_k(self._query_param(scope, "k"))
+        except ValueError as e:
+            await send_body(send, 400, encode_json({"error": str(e)}))
+            return route, 400
+
+        books = await self.books.similar(book_id, k)
+        if books is None:
+            await send_body(send, 404, encode_json({"error": "Book not found"}))
+            return route, 404
+        await send_body(send, 200, encode_json(books))
+        return route, 200
+
+    @staticmethod
+    def _query_param(scope, name: str) -> Optional[str]:
+        values = parse_qs(scope.get("query_string", b"").decode("latin-1")).get(name)
+        return values[-1] if values else None
+
+    async def _stream_books(self, send, fields: Projection = None):
+        """
+        Stream the catalog as one JSON array, chunk by chunk.
+
+        No content-length is sent, so the server uses chunked transfer
+        encoding; each ``await send`` applies the client's backpressure.
+        """
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json")],
+        })
+        first = True
+        async for chunk in self.books.chunks(self.chunk_rows):
+            if not chunk:
+                continue
+            body = self.books.encode_many(chunk, fields)
+            await send({
+                "type": "http.response.body",
+                "body": (b"[" if first else b",") + body,
+                "more_body": True,
+            })
+            first = False
+        await send({"type": "http.response.body", "body": b"[]" if first else b"]"})
+
+
+def create_app(db_path: str = None, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> BooksASGIApp:
+    """
+    Build an ASGI app (usable as an uvicorn factory: ``api.asgi:create_app``).
+    """
+    return BooksASGIApp(db_path=db_path, chunk_rows=chunk_rows)
+
+
+# Default app over the in-memory catalog (``uvicorn api.asgi:app``)
+app = create_app()
+
+
+def run_asgi_server(host: str = '127.0.0.1', port: int = 5000, db_path: str = None):
+    """
+    Run the ASGI app with uvicorn (blocking).
+
+    Parameters:
+    -----------
+    host : str, optional
+        The hostname to bind to (default: '127.0.0.1')
+    port : int, optional
+        The port number to listen on (default: 5000)
+    db_path : str, optional
+        SQLite database to serve instead of the in-memory catalog
+    """
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("✗ ASGI mode needs uvicorn: pip install uvicorn")
+
+    uvicorn.run(create_app(db_path=db_path) if db_path else app,
+                host=host, port=port, log_level="warning",
+                # Keep idle keep-alive connections around; they only cost a socket
+                timeout_keep_alive=75, backlog=4096)
@@ -0,0 +1,168 @@
+"""
+Book catalog served by the Books API.
+
+Holds the sample authors and titles, the random book generator and the
+in-memory catalog shared by the Flask (api.server) and ASGI (api.asgi) apps.
+This module only uses the standard library so either app can import it.
+"""
+
+import random      # For generating random book data
+import threading   # For guarding lazy catalog generation
+from typing import Dict, List, Optional
+
+# -----------------------------------------------------------------------------
+# Lists of authors and book titles for generating random books
+# -----------------------------------------------------------------------------
+
+# Famous authors from various genres and time periods
+AUTHORS = [
+    "Jane Austen", "Charles Dickens", "Mark Twain", "Ernest Hemingway",
+    "Virginia Woolf", "George Orwell", "F. Scott Fitzgerald", "Leo Tolstoy",
+    "Gabriel García Márquez", "Toni Morrison", "Haruki Murakami", "J.K. Rowling",
+    "Stephen King", "Agatha Christie", "Oscar Wilde", "Franz Kafka",
+    "Albert Camus", "Hermann Hesse", "Paulo Coelho", "Dan Brown"
+]
+
+# Creative book titles for random generation
+TITLES = [
+    "The Silent Echo", "Midnight Dreams", "Beyond the Horizon", "Whispers in Time",
+    "The Last Chapter", "Shadows of Tomorrow", "The Hidden Path", "Echoes of War",
+    "The Forgotten Kingdom", "Secrets of the Heart", "The Crystal Tower", "Dancing with Destiny",
+    "The Iron Gate", "Waves of Change", "The Burning Sky", "Lost in Translation",
+    "The Golden Compass", "River of Stars", "The Midnight Garden", "Winds of Fortune",
+    "The Silent Witness", "Broken Promises", "The Dark Mirror", "Songs of Freedom",
+    "The Empty Throne", "Chasing Shadows", "The Final Hour", "Dreams of Glory",
+    "The Wandering Soul", "Bridges of Hope", "The Sacred Fire", "Tales of Wonder",
+    "The Crimson Rose", "Voices from Beyond", "The Shattered Glass", "Journeys End",
+    "The Hollow Crown", "Storms of Passion", "The Velvet Night", "Legends Reborn",
+    "The Amber Stone", "Faces in the Crowd", "The Frozen Lake", "Whispers of Love",
+    "The Rising Sun", "Depths of Despair", "The Silver Lining", "Masks of Deceit",
+    "The Endless Road", "Colors of Autumn"
+]
+
+
+def generate_books(count: int = 100) -> List[Dict]:
+    """
+    Generate a list of random books.
+
+    This function creates book dictionaries with random combinations of:
+    - Unique sequential ID
+    - Title (randomly selected from TITLES, optionally with Roman numeral suffix)
+    - Author (randomly selected from AUTHORS)
+    - Publication year (random year between 1850 and 2025)
+
+    Parameters:
+    -----------
+    count : int, optional
+        Number of books to generate (default: 100)
+
+    Returns:
+    --------
+    List[Dict]
+        List of book dictionaries with keys: id, title, author, publication_year
+
+    Example:
+    --------
+    >>> books = generate_books(5)
+    >>> print(books[0])
+    {'id': 1, 'title': 'The Silent Echo II', 'author': 'Jane Austen', 'publication_year': 1920}
+    """
+    books = []
+
+    for i in range(count):
+        # Create a book dictionary with random data
+        book = {
+            "id": i + 1,  # Unique sequential ID starting from 1
+            # Combine random title with optional Roman numeral (I, II, III, or empty)
+            "title": f"{random.choice(TITLES)} {random.choice(['I', 'II', 'III', ''])}".strip(),
+            "author": random.choice(AUTHORS),  # Random author from list
+            "publication_year": random.randint(1850, 2025)  # Random year in range
+        }
+        books.append(book)
+
+    return books
+
+
+# -----------------------------------------------------------------------------
+# Catalog served by the API
+# -----------------------------------------------------------------------------
+
+# Number of books generated when nothing else has been loaded
+CATALOG_SIZE = 100
+
+# The catalog is generated on first use (see get_books()) rather than at
+# import time, so importing this module stays cheap
+BOOKS: List[Dict] = None
+_book_index: Dict[int, Dict] = None
+_catalog_lock = threading.Lock()
+
+# Incremented whenever BOOKS is replaced, so caches derived from the
+# catalog (e.g. api.fragments) know when to throw their contents away
+CATALOG_VERSION = 0
+
+# Fields of every book, in the order they are stored in SQLite
+BOOK_FIELDS = ("id", "title", "author", "publication_year")
+
+
+def get_books() -> List[Dict]:
+    """
+    Return the catalog served by the API, generating it on first use.
+
+    Returns:
+    --------
+    List[Dict]
+        The current list of book dictionaries
+    """
+    global BOOKS, CATALOG_VERSION
+    if BOOKS is None:
+        with _catalog_lock:
+            if BOOKS is None:
+                BOOKS = generate_books(CATALOG_SIZE)
+                CATALOG_VERSION += 1
+    return BOOKS
+
+
+def set_books(books: List[Dict]):
+    """
+    Replace the catalog served by the API.
+
+    Parameters:
+    -----------
+    books : List[Dict]
+        New list of book dictionaries with keys: id, title, author, publication_year
+    """
+    global BOOKS, CATALOG_VERSION, _book_index
+    with _catalog_lock:
+        BOOKS = books
+        CATALOG_VERSION += 1
+        _book_index = None
+
+
+def find_book(book_id: int) -> Optional[Dict]:
+    """
+    Look up a book by ID in the current catalog.
+
+    A dictionary index from ID to book is built on first lookup and
+    rebuilt whenever the catalog changes, so lookups are O(1) instead of
+    a scan over the whole catalog.
+
+    Parameters:
+    -----------
+    book_id : int
+        The unique identifier of the book to retrieve
+
+    Returns:
+    --------
+    Dict or None
+        The book dictionary, or None if no book has that ID
+    """
+    global _book_index
+    index = _book_index
+    if index is None:
+        books = get_books()
+        index = {b["id"]: b for b in books}
+        with _catalog_lock:
+            # Only publish the index if the catalog was not replaced meanwhile
+            if BOOKS is books:
+                _book_index = index
+    return index.get(book_id)
@@ -0,0 +1,148 @@
+"""
+Field projection and pre-encoded JSON fragments for the Books API.
+
+Catalog books never change once generated, so re-running the JSON encoder
+on the same dictionary for every request is wasted work. This module
+keeps, per projection (the set of fields a client asked for with
+``?fields=``), the encoded bytes of every book it has served. Responses
+are then assembled by joining cached bytes:
+
+    /books/7?fields=title   ->  b'{"title":"The Iron Gate"}'
+    /books?fields=id,title  ->  b'[' + b','.join(fragments) + b']'
+
+Fragments are built lazily on first use and the whole cache is dropped
+whenever the catalog is replaced (see api.catalog.CATALOG_VERSION).
+Only the most recently used ``max_projections`` projections are kept,
+so unusual field combinations cannot grow the cache without bound.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from api import catalog
+
+# Number of distinct projections whose fragments are cached at once
+DEFAULT_MAX_PROJECTIONS = 4
+
+Projection = Optional[Tuple[str, ...]]
+
+
+def encode_json(payload) -> bytes:
+    """
+    Encode a payload the same way Flask's jsonify() does (sorted keys, compact).
+    """
+    return json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+
+
+def parse_fields(raw: Optional[str]) -> Projection:
+    """
+    Parse a ``fields=`` query parameter into a projection.
+
+    Parameters:
+    -----------
+    raw : str or None
+        Comma-separated field names, e.g. 'title,author'
+
+    Returns:
+    --------
+    tuple or None
+        Sorted tuple of field names, or None for "all fields"
+
+    Raises:
+    -------
+    ValueError
+        If a requested field is not a book field
+    """
+    if not raw:
+        return None
+    fields = {f.strip() for f in raw.split(",") if f.strip()}
+    unknown = sorted(fields - set(catalog.BOOK_FIELDS))
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    if not fields or fields == set(catalog.BOOK_FIELDS):
+        return None
+    # Sorted so 'title,id' and 'id,title' share one cache entry
+    return tuple(sorted(fields))
+
+
+def project(book: Dict, fields: Projection) -> Dict:
+    """Return ``book`` restricted to ``fields`` (the book itself for None)."""
+    if fields is None:
+        return book
+    return {f: book[f] for f in fields}
+
+
+def encode_book(book: Dict, fields: Projection = None) -> bytes:
+    """Encode one book under a projection without caching."""
+    return encode_json(project(book, fields))
+
+
+def encode_books(books: Iterable[Dict], fields: Projection = None) -> bytes:
+    """Encode books as comma-separated objects (no brackets) without caching."""
+    return b",".join(encode_json(project(b, fields)) for b in books)
+
+
+class FragmentCache:
+    """
+    Lazily built cache of encoded book fragments, keyed by projection.
+
+    Parameters:
+    -----------
+    max_projections : int, optional
+        Projections kept at once, least recently used evicted first
+        (default: DEFAULT_MAX_PROJECTIONS)
+    """
+
+    def __init__(self, max_projections: int = DEFAULT_MAX_PROJECTIONS):
+        self.max_projections = max_projections
+        self._version = None
+        self._by_projection: "OrderedDict[Projection, Dict[int, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _fragments_for(self, fields: Projection) -> Dict[int, bytes]:
+        """Return the id -> bytes map for a projection, resetting on catalog change."""
+        with self._lock:
+            if self._version != catalog.CATALOG_VERSION:
+                self._by_projection.clear()
+                self._version = catalog.CATALOG_VERSION
+            fragments = self._by_projection.get(fields)
+            if fragments is None:
+                fragments = self._by_projection[fields] = {}
+                while len(self._by_projection) > self.max_projections:
+                    self._by_projection.popitem(last=False)
+            else:
+                self._by_projection.move_to_end(fields)
+            return fragments
+
+    def fragment(self, book: Dict, fields: Projection = None) -> bytes:
+        """Return the encoded bytes of one catalog book."""
+        fragments = self._fragments_for(fields)
+        data = fragments.get(book["id"])
+        if data is None:
+            data = fragments[book["id"]] = encode_book(book, fields)
+        return data
+
+    def join(self, books: Iterable[Dict], fields: Projection = None) -> bytes:
+        """Return catalog books as comma-separated fragments (no brackets)."""
+        fragments = self._fragments_for(fields)
+        parts = []
+        for book in books:
+            data = fragments.get(book["id"])
+            if data is None:
+                data = fragments[book["id"]] = encode_book(book, fields)
+            parts.append(data)
+        return b",".join(parts)
+
+    def array(self, books: Iterable[Dict], fields: Projection = None) -> bytes:
+        """Return catalog books as a complete JSON array."""
+        return b"[" + self.join(books, fields) + b"]"
+
+    def clear(self):
+        with self._lock:
+            self._by_projection.clear()
+
+
+# Shared cache used by both the Flask and ASGI apps
+CACHE = FragmentCache()
@@ -0,0 +1,245 @@
+"""
+Flask API server for the Books Application.
+
+Serves a catalog of randomly generated books over REST endpoints
+(``/``, ``/books``, ``/books/<id>``, ``/books/<id>/similar``) and exposes
+metrics at ``/metrics``.
+"""
+
+# Flask framework for creating the REST API server
+from flask import Flask, Response, g, jsonify, request
+
+# Standard library imports
+import threading   # For running server in background thread
+import time        # For timing requests
+
+# Book catalog shared with the ASGI app (re-exported for existing callers)
+from api.catalog import AUTHORS, TITLES, generate_books, get_books, set_books, find_book
+
+# Pre-encoded per-book JSON fragments and ?fields= projection
+from api import fragments
+
+# Request counters and latency histograms, opt-in cProfile sampling
+from services import metrics, profiling
+
+# Create Flask application instance
+# Flask(__name__) uses the current module name for configuration
+app = Flask(__name__)
+
+# =============================================================================
+# REQUEST INSTRUMENTATION
+# =============================================================================
+
+@app.before_request
+def start_request_timer():
+    """Remember when the request started so after_request can time it."""
+    g.request_start = time.perf_counter()
+    # Sampled only when profiling is enabled (BOOKS_PROFILE=1 / --profile)
+    g.profiler = profiling.start() if profiling.sample_request() else None
+
+
+@app.after_request
+def record_request_metrics(response):
+    """
+    Count the request and observe its latency under its route template.
+
+    The route template (e.g. '/books/<int:book_id>') is used instead of the
+    raw path so the number of label values stays bounded.
+    """
+    start = g.get("request_start")
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else "<unmatched>"
+        metrics.record_http_request(route, request.method, response.status_code,
+                                    time.perf_counter() - start)
+    return response
+
+
+@app.teardown_request
+def write_request_profile(exc=None):
+    """Stop a sampled request's profiler and write it under its route."""
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        route = request.url_rule.rule if request.url_rule else "<unmatched>"
+        profiling.stop(profiler, f"http {request.method} {route}")
+
+
+# =============================================================================
+# FLASK API ROUTES
+# =============================================================================
+
+@app.route('/')
+def home():
+    """
+    Home endpoint - Returns API welcome message and available endpoints.
+
+    Returns:
+    --------
+    JSON response with welcome message and endpoint documentation
+    """
+    return jsonify({
+        "message": "Welcome to the Books API",
+        "endpoints": {
+            "/books": "Get all books (optional ?fields=id,title,...)",
+            "/books/<id>": "Get a specific book by ID (optional ?fields=...)",
+            "/books/<id>/similar": "Books with similar titles (optional ?k=10)",
+            "/metrics": "Prometheus metrics"
+        }
+    })
+
+
+@app.route('/books')
+def get_all_books():
+    """
+    Get all books endpoint - Returns complete list of books.
+
+    Query Parameters:
+    -----------------
+    fields : str, optional
+        Comma-separated fields to return, e.g. 'id,title' (default: all)
+
+    Returns:
+    --------
+    JSON array containing all generated books, or 400 for unknown fields
+    """
+    try:
+        fields = fragments.parse_fields(request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Join cached per-book fragments instead of re-encoding every dict
+    return Response(fragments.CACHE.array(get_books(), fields), mimetype="application/json")
+
+
+@app.route('/books/<int:book_id>')
+def get_book(book_id: int):
+    """
+    Get single book endpoint - Returns a specific book by its ID.
+
+    Parameters:
+    -----------
+    book_id : int
+        The unique identifier of the book to retrieve
+
+    Query Parameters:
+    -----------------
+    fields : str, optional
+        Comma-separated fields to return, e.g. 'title' (default: all)
+
+    Returns:
+    --------
+    JSON object with book data, 404 error if not found, 400 for unknown fields
+    """
+    try:
+        fields = fragments.parse_fields(request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Look the book up in the catalog's id index
+    book = find_book(book_id)
+
+    if book:
+        return Response(fragments.CACHE.fragment(book, fields), mimetype="application/json")
+
+    # Return 404 error if book not found
+    return jsonify({"error": "Book not found"}), 404
+
+
+@app.route('/books/<int:book_id>/similar')
+def get_similar_books(book_id: int):
+    """
+    Similar books endpoint - Returns the books whose titles are closest to a book's.
+
+    Parameters:
+    -----------
+    book_id : int
+        The unique identifier of the book to compare against
+
+    Query Parameters:
+    -----------------
+    k : int, optional
+        Number of books to return, 1..100 (default: 10)
+
+    Returns:
+    --------
+    JSON array of books with a 'score' (cosine similarity), best first;
+    404 error if the book is not found, 400 for an invalid k
+    """
+    # Imported on first use: the vector index needs NumPy
+    from api import similar
+
+    try:
+        k = similar.parse_k(request.args.get("k"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    books = similar.similar_books(book_id, k)
+    if books is None:
+        return jsonify({"error": "Book not found"}), 404
+    return jsonify(books)
+
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """
+    Metrics endpoint - Returns counters and histograms in Prometheus text format.
+    """
+    return Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+
+# =============================================================================
+# SERVER FUNCTIONS
+# =============================================================================
+
+def run_server(host: str = '127.0.0.1', port: int = 5000):
+    """
+    Run the Flask server (blocking).
+
+    This function starts the Flask development server and blocks
+    until the server is stopped. Use start_server_thread() for
+    non-blocking execution.
+
+    Parameters:
+    -----------
+    host : str, optional
+        The hostname to bind to (default: '127.0.0.1' for localhost)
+    port : int, optional
+        The port number to listen on (default: 5000)
+    """
+    # debug=False prevents auto-reload in production
+    # use_reloader=False prevents double startup in threaded mode
+    app.run(host=host, port=port, debug=False, use_reloader=False)
+
+
+def start_server_thread(host: str = '127.0.0.1', port: int = 5000):
+    """
+    Start the Flask server in a background thread.
+
+    This allows the server to run concurrently while other code
+    executes. The thread is set as daemon=True so it automatically
+    stops when the main program exits.
+
+    Parameters:
+    -----------
+    host : str, optional
+        The hostname to bind to (default: '127.0.0.1')
+    port : int, optional
+        The port number to listen on (default: 5000)
+
+    Returns:
+    --------
+    threading.Thread
+        The thread object running the server
+    """
+    # Create a daemon thread for the server
+    # daemon=True means thread will stop when main program exits
+    server_thread = threading.Thread(
+        target=run_server,
+        args=(host, port),
+        daemon=True
+    )
+    server_thread.start()
+    return server_thread
+
+
+if __name__ == '__main__':
+    run_server()
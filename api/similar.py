@@ -0,0 +1,93 @@
+"""
+Similar-titles lookup for the Books API (``/books/<id>/similar``).
+
+The in-memory catalog gets its own services.similarity index, built on
+the first request and rebuilt whenever the catalog is replaced (see
+api.catalog.CATALOG_VERSION). Databases synced with ``run.py sync
+--index`` keep a persistent index next to the SQLite file instead, which
+the ASGI app memory-maps (api.asgi.SqliteBooks).
+
+This module imports NumPy, so the apps import it on first use only.
+"""
+
+import threading
+from typing import Dict, List, Optional
+
+from api import catalog
+from services.similarity import DEFAULT_K, SimilarityIndex
+
+# Largest ?k= a client may ask for
+MAX_K = 100
+
+_index: Optional[SimilarityIndex] = None
+_index_version = None
+_index_lock = threading.Lock()
+
+
+def parse_k(raw: Optional[str]) -> int:
+    """
+    Parse a ``k=`` query parameter.
+
+    Raises:
+    -------
+    ValueError
+        If it is not an integer between 1 and MAX_K
+    """
+    if not raw:
+        return DEFAULT_K
+    try:
+        k = int(raw)
+    except ValueError:
+        raise ValueError(f"k must be an integer, got {raw!r}")
+    if not 1 <= k <= MAX_K:
+        raise ValueError(f"k must be between 1 and {MAX_K}")
+    return k
+
+
+def catalog_index() -> SimilarityIndex:
+    """Return the index of the current catalog, (re)building it if needed."""
+    global _index, _index_version
+    with _index_lock:
+        if _index is None or _index_version != catalog.CATALOG_VERSION:
+            books = catalog.get_books()
+            version = catalog.CATALOG_VERSION
+            index = SimilarityIndex()
+            index.add(books)
+            index.build_clusters()
+            _index, _index_version = index, version
+        return _index
+
+
+def with_scores(books: Dict[int, Dict], results) -> List[Dict]:
+    """Books of (id, score) results, best first, each with a 'score' key."""
+    return [dict(books[book_id], score=round(score, 4))
+            for book_id, score in results if book_id in books]
+
+
+def similar_books(book_id: int, k: int = DEFAULT_K) -> Optional[List[Dict]]:
+    """
+    Catalog books whose titles are most similar to book ``book_id``.
+
+    Parameters:
+    -----------
+    book_id : int
+        ID of a catalog book
+    k : int, optional
+        Number of books to return (default: DEFAULT_K)
+
+    Returns:
+    --------
+    List[Dict] or None
+        Book dictionaries with an added 'score' (cosine similarity, 0..1),
+        best first; None if no book has that ID
+
+    Example:
+    --------
+    >>> similar_books(7, k=2)
+    [{'id': 31, 'title': 'The Iron Gate II', ..., 'score': 0.8721}, ...]
+    """
+    if catalog.find_book(book_id) is None:
+        return None
+    results = catalog_index().similar(book_id, k)
+    books = {i: catalog.find_book(i) for i, _ in results}
+    return with_scores({i: b for i, b in books.items() if b is not None}, results)
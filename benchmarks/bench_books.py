@@ -0,0 +1,392 @@
+"""
+End-to-end benchmark suite for the books pipeline.
+
+Starts the Flask API locally, seeds catalogs of different sizes with
+``generate_books`` and measures:
+
+- HTTP throughput and latency percentiles for ``/books`` and ``/books/<id>``
+- ``fetch_books_from_api`` wall time
+- ``store_books`` insert throughput (rows/sec)
+- ``display_books`` and ``get_all_books`` read time
+
+Results are written as JSON so two runs can be compared with ``--compare``.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_books --sizes 100 10000 1000000 --output bench.json
+    python -m benchmarks.bench_books --compare baseline.json --output bench.json
+"""
+
+import argparse
+import contextlib
+import http.client
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from api import server
+from db.database import create_database, store_books, display_books, get_all_books
+from services.api_client import fetch_books_from_api
+
+DEFAULT_SIZES = [100, 10_000, 1_000_000]
+
+
+# =============================================================================
+# MEASUREMENT HELPERS
+# =============================================================================
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """
+    Return the ``pct`` percentile of an already sorted list (nearest-rank).
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize_latencies(latencies: List[float], elapsed: float, errors: int) -> Dict:
+    """
+    Turn raw per-request latencies (seconds) into a summary dictionary.
+
+    Latencies are reported in milliseconds.
+    """
+    ordered = sorted(latencies)
+    count = len(ordered)
+    return {
+        "requests": count,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 4),
+        "requests_per_s": round(count / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(sum(ordered) / count * 1000, 3) if count else 0.0,
+            "p50": round(percentile(ordered, 50) * 1000, 3),
+            "p90": round(percentile(ordered, 90) * 1000, 3),
+            "p95": round(percentile(ordered, 95) * 1000, 3),
+            "p99": round(percentile(ordered, 99) * 1000, 3),
+            "max": round(ordered[-1] * 1000, 3) if count else 0.0,
+        },
+    }
+
+
+@contextlib.contextmanager
+def quiet_stdout():
+    """
+    Silence stdout so printing functions are timed without terminal cost.
+    """
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def timed(func: Callable, *args, **kwargs):
+    """
+    Call ``func`` and return ``(result, elapsed_seconds)``.
+    """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+# =============================================================================
+# HTTP LOAD GENERATION
+# =============================================================================
+
+class QuietRequestHandler(WSGIRequestHandler):
+    """
+    Request handler that skips the per-request access log line.
+    """
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def start_bench_server(host: str = "127.0.0.1"):
+    """
+    Start the Flask app on a free port in a background thread.
+
+    Unlike ``start_server_thread`` this server can be shut down again,
+    which lets one benchmark run serve several catalogs in turn.
+
+    Returns:
+    --------
+    tuple
+        (werkzeug server, port)
+    """
+    httpd = make_server(host, 0, server.app, threaded=True,
+                        request_handler=QuietRequestHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd, httpd.server_port
+
+
+def run_http_load(host: str, port: int, next_path: Callable[[], str],
+                  concurrency: int, duration: float, max_requests: int) -> Dict:
+    """
+    Hammer the server with ``concurrency`` keep-alive clients.
+
+    Each worker issues requests until ``duration`` seconds have passed or
+    the shared ``max_requests`` budget is spent. Every worker always sends
+    at least one request so slow endpoints still produce a sample.
+    """
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    issued = [0]
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        conn = http.client.HTTPConnection(host, port, timeout=300)
+        local, local_errors, first = [], 0, True
+        while True:
+            with lock:
+                if not first and (issued[0] >= max_requests or time.perf_counter() >= deadline):
+                    break
+                issued[0] += 1
+                path = next_path()
+            first = False
+            start = time.perf_counter()
+            try:
+                conn.request("GET", path)
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 500:
+                    local_errors += 1
+                if response.getheader("Connection", "").lower() == "close":
+                    conn.close()
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=300)
+                continue
+            local.append(time.perf_counter() - start)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return summarize_latencies(latencies, time.perf_counter() - started, errors[0])
+
+
+# =============================================================================
+# BENCHMARK STAGES
+# =============================================================================
+
+def bench_catalog(size: int, args, rng: random.Random) -> Dict:
+    """
+    Run every benchmark stage against a freshly seeded catalog of ``size`` books.
+    """
+    random.seed(args.seed)
+    books, gen_s = timed(server.generate_books, size)
+    server.set_books(books)
+    result = {"catalog_size": size, "generate_s": round(gen_s, 4)}
+
+    httpd, port = start_bench_server()
+    try:
+        result["http"] = {
+            "/books": run_http_load(
+                "127.0.0.1", port, lambda: "/books",
+                args.concurrency, args.duration, args.requests),
+            "/books/<id>": run_http_load(
+                "127.0.0.1", port, lambda: f"/books/{rng.randint(1, size)}",
+                args.concurrency, args.duration, args.requests),
+        }
+
+        with quiet_stdout():
+            fetched, fetch_s = timed(fetch_books_from_api, f"http://127.0.0.1:{port}/books")
+        # fetch_books_from_api returns [] on any error (e.g. its timeout), which
+        # would otherwise look like a very fast fetch
+        result["fetch"] = {"books": len(fetched), "seconds": round(fetch_s, 4),
+                           "ok": len(fetched) == size}
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = create_database(os.path.join(tmp, "bench_books.db"))
+        try:
+            with quiet_stdout():
+                _, store_s = timed(store_books, conn, books)
+                _, display_s = timed(display_books, conn)
+            rows, read_s = timed(get_all_books, conn)
+        finally:
+            conn.close()
+
+    result["store_books"] = {
+        "rows": size,
+        "seconds": round(store_s, 4),
+        "rows_per_s": round(size / store_s, 1) if store_s else 0.0,
+    }
+    result["display_books"] = {"seconds": round(display_s, 4)}
+    result["get_all_books"] = {"rows": len(rows), "seconds": round(read_s, 4)}
+    return result
+
+
+def run_metadata(args) -> Dict:
+    """
+    Describe the environment so results from different machines are not mixed up.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "args": {
+            "sizes": args.sizes,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "requests": args.requests,
+            "seed": args.seed,
+        },
+    }
+
+
+# =============================================================================
+# COMPARISON
+# =============================================================================
+
+# (label, path into a per-size result, True when higher is better)
+COMPARED_METRICS = [
+    ("/books req/s", ("http", "/books", "requests_per_s"), True),
+    ("/books p99 ms", ("http", "/books", "latency_ms", "p99"), False),
+    ("/books/<id> req/s", ("http", "/books/<id>", "requests_per_s"), True),
+    ("/books/<id> p99 ms", ("http", "/books/<id>", "latency_ms", "p99"), False),
+    ("fetch s", ("fetch", "seconds"), False),
+    ("store_books rows/s", ("store_books", "rows_per_s"), True),
+    ("display_books s", ("display_books", "seconds"), False),
+    ("get_all_books s", ("get_all_books", "seconds"), False),
+]
+
+
+def _lookup(data: Dict, path):
+    for key in path:
+        if not isinstance(data, dict) or key not in data:
+            return None
+        data = data[key]
+    return data
+
+
+def compare_results(baseline: Dict, current: Dict) -> List[Dict]:
+    """
+    Compare two result documents catalog size by catalog size.
+
+    Returns one row per metric with the relative change and whether the
+    change is an improvement. Metrics of a stage that failed in either
+    run (``"ok": false``, e.g. a fetch that timed out) are flagged as
+    ``failed`` and never count as an improvement.
+    """
+    old_by_size = {r["catalog_size"]: r for r in baseline.get("results", [])}
+    rows = []
+    for new in current.get("results", []):
+        old = old_by_size.get(new["catalog_size"])
+        if old is None:
+            continue
+        for label, path, higher_is_better in COMPARED_METRICS:
+            before, after = _lookup(old, path), _lookup(new, path)
+            if not before or after is None:
+                continue
+            change = (after - before) / before * 100
+            failed = _lookup(old, path[:1] + ("ok",)) is False or \
+                _lookup(new, path[:1] + ("ok",)) is False
+            rows.append({
+                "catalog_size": new["catalog_size"],
+                "metric": label,
+                "baseline": before,
+                "current": after,
+                "change_pct": round(change, 1),
+                "improved": not failed and (change > 0 if higher_is_better else change < 0),
+                "failed": failed,
+            })
+    return rows
+
+
+def print_comparison(rows: List[Dict]):
+    """
+    Print the output of compare_results() as an aligned table.
+    """
+    print("\n" + "=" * 78)
+    print(f"{'Size':>9}  {'Metric':<20} {'Baseline':>12} {'Current':>12} {'Change':>9}")
+    print("=" * 78)
+    for row in rows:
+        marker = "FAILED" if row.get("failed") else "+" if row["improved"] else "-"
+        print(f"{row['catalog_size']:>9}  {row['metric']:<20} {row['baseline']:>12} "
+              f"{row['current']:>12} {row['change_pct']:>8}% {marker}")
+    print("=" * 78)
+
+
+# =============================================================================
+# ENTRY POINT
+# =============================================================================
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the books pipeline end to end.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="catalog sizes to seed (default: 100 10000 1000000)")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="concurrent HTTP clients per endpoint (default: 4)")
+    parser.add_argument("--duration", type=float, default=5.0,
+                        help="seconds of load per endpoint and size (default: 5)")
+    parser.add_argument("--requests", type=int, default=5000,
+                        help="maximum requests per endpoint and size (default: 5000)")
+    parser.add_argument("--seed", type=int, default=42,
+                        help="random seed for catalogs and book ids (default: 42)")
+    parser.add_argument("--output", default="bench_results.json",
+                        help="where to write the JSON results (default: bench_results.json)")
+    parser.add_argument("--compare", metavar="BASELINE_JSON",
+                        help="previous results file to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    rng = random.Random(args.seed)
+
+    document = {"meta": run_metadata(args), "results": []}
+    for size in args.sizes:
+        print(f"Benchmarking catalog of {size} books...", flush=True)
+        result = bench_catalog(size, args, rng)
+        document["results"].append(result)
+        print(f"  /books       {result['http']['/books']['requests_per_s']:>10} req/s  "
+              f"p99 {result['http']['/books']['latency_ms']['p99']} ms")
+        print(f"  /books/<id>  {result['http']['/books/<id>']['requests_per_s']:>10} req/s  "
+              f"p99 {result['http']['/books/<id>']['latency_ms']['p99']} ms")
+        print(f"  store_books  {result['store_books']['rows_per_s']:>10} rows/s")
+        if not result["fetch"]["ok"]:
+            print(f"  ✗ fetch returned {result['fetch']['books']} of {size} books")
+
+    with open(args.output, "w", encoding="utf-8") as fh:
+        json.dump(document, fh, indent=2)
+    print(f"✓ Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        print_comparison(compare_results(baseline, document))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
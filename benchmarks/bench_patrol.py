@@ -0,0 +1,98 @@
+"""
+Offline timing benchmark for the turtle2.py patrol.
+
+Drives the waypoint route with the same RouteEngine turtle2.py uses, but
+against navigation.sim.SimulatedMoveBase instead of a live ROS
+move_base, and records per-leg send -> result latency, idle time between
+goals and the total time of every patrol cycle to CSV. Changes to the
+navigation loop (tolerance, ordering, dwell, engine internals) can then
+be compared on any Linux box.
+
+All times are reported in simulated seconds: with ``--time-scale 20``
+the run takes a twentieth of that in wall-clock time.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_patrol --cycles 5 --output patrol_timing.csv
+    python -m benchmarks.bench_patrol --optimize --tolerance 0.3 --failure-rate 0.05
+"""
+
+import argparse
+import sys
+
+from navigation.planner import plan_route, route_length
+from navigation.route import RouteEngine
+from navigation.sim import SimulatedMoveBase, sim_goal
+from navigation.timing import leg_timings, timing_summary, write_timing_csv
+from navigation.waypoints import DEFAULT_ROUTE_FILE, load_route
+
+
+def run_patrol(route, cycles: int, speed: float, failure_rate: float, time_scale: float,
+               tolerance: float = 0.0, dwell: float = 0.0, seed: int = None,
+               verbose: bool = False):
+    """
+    Drive ``route`` against the simulator and return (timing rows, client).
+    """
+    first = route.legs()[0]
+    client = SimulatedMoveBase(speed=speed, failure_rate=failure_rate, start=(first.x, first.y),
+                               time_scale=time_scale, seed=seed)
+    # Dwell is given in simulated seconds like everything else
+    engine = RouteEngine(client, route, goal_factory=sim_goal, stamp=None,
+                         tolerance=tolerance, dwell=dwell / time_scale, verbose=verbose)
+    results = engine.run(cycles)
+    return leg_timings(results, time_scale=time_scale), client
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Patrol timing benchmark (simulated move_base)")
+    parser.add_argument("--waypoints", default=DEFAULT_ROUTE_FILE,
+                        help="YAML or CSV waypoint file (default: navigation/patrol.yaml)")
+    parser.add_argument("--cycles", type=int, default=3,
+                        help="patrol cycles to drive (default: 3)")
+    parser.add_argument("--speed", type=float, default=0.5,
+                        help="simulated travel speed in m/s (default: 0.5)")
+    parser.add_argument("--failure-rate", type=float, default=0.0,
+                        help="probability that a goal is aborted (default: 0)")
+    parser.add_argument("--time-scale", type=float, default=20.0,
+                        help="simulation speed-up over real time (default: 20)")
+    parser.add_argument("--tolerance", type=float, default=0.0,
+                        help="early hand-off radius in metres (default: 0)")
+    parser.add_argument("--dwell", type=float, default=0.0,
+                        help="simulated seconds to stay at each waypoint (default: 0)")
+    parser.add_argument("--optimize", action="store_true",
+                        help="reorder the waypoints with navigation.planner first")
+    parser.add_argument("--seed", type=int, default=42,
+                        help="seed for the simulated failures (default: 42)")
+    parser.add_argument("--output", default="patrol_timing.csv",
+                        help="per-leg timing CSV (default: patrol_timing.csv)")
+    parser.add_argument("--verbose", action="store_true",
+                        help="print every leg (wall-clock times)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    route = load_route(args.waypoints)
+    if args.optimize:
+        route = plan_route(route)
+    print(f"Route: {' -> '.join(w.name for w in route.legs())} "
+          f"({route_length(route):.2f} m per cycle)")
+
+    rows, client = run_patrol(route, args.cycles, args.speed, args.failure_rate,
+                              args.time_scale, args.tolerance, args.dwell, args.seed,
+                              args.verbose)
+    write_timing_csv(rows, args.output)
+
+    summary = timing_summary(rows)
+    print(f"  legs         {summary['legs']} ({summary['failed']} failed)")
+    print(f"  latency      {summary['mean_latency_s']:.2f} s mean per leg")
+    print(f"  idle         {summary['total_idle_s']:.4f} s total, "
+          f"{summary['max_idle_s']:.4f} s max between goals")
+    print(f"  cycle time   {summary['mean_cycle_s']:.2f} s mean "
+          f"({', '.join(f'{c:.2f}' for c in summary['cycle_s'])})")
+    print(f"  distance     {client.distance_travelled:.2f} m")
+    print(f"✓ Timings written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+"""SQLite storage layer for the Books Application."""
+
+from db.database import (
+    DB_PATH,
+    create_database,
+    clear_database,
+    store_books,
+    display_books,
+    get_all_books,
+    update_similarity_index,
+)
+from db.export import export_table
+
+__all__ = [
+    "DB_PATH",
+    "create_database",
+    "clear_database",
+    "store_books",
+    "display_books",
+    "get_all_books",
+    "update_similarity_index",
+    "export_table",
+]
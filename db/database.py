@@ -0,0 +1,218 @@
+"""
+SQLite database operations for the Books Application.
+
+Creates the ``books`` table, stores fetched books and reads them back
+either as a formatted table or as a list of dictionaries. The
+similar-titles index next to the database file (services.similarity) is
+only updated on request, with update_similarity_index().
+"""
+
+import os
+import sqlite3
+from typing import List, Dict
+
+from services import metrics, profiling
+from services.index_paths import database_path, index_path, remove_index
+
+# Default database location: books.db in the current working directory
+DB_PATH = os.path.join(os.getcwd(), 'books.db')
+
+
+def create_database(db_path: str = None) -> sqlite3.Connection:
+    """
+    Create SQLite database and books table.
+
+    Creates a new database file (or connects to existing one) and
+    ensures the 'books' table exists with the proper schema.
+
+    Parameters:
+    -----------
+    db_path : str, optional
+        Path of the database file (default: None = DB_PATH)
+
+    Returns:
+    --------
+    sqlite3.Connection
+        Active database connection object
+
+    Table Schema:
+    -------------
+    - id: INTEGER PRIMARY KEY AUTOINCREMENT (auto-generated unique ID)
+    - title: TEXT NOT NULL (book title)
+    - author: TEXT NOT NULL (author name)
+    - publication_year: INTEGER (year of publication)
+    """
+
+    conn = sqlite3.connect(db_path or DB_PATH)
+    cursor = conn.cursor()
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS books (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            author TEXT NOT NULL,
+            publication_year INTEGER
+        )
+    ''')
+
+    conn.commit()
+    return conn
+
+
+def clear_database(conn: sqlite3.Connection):
+    """
+    Clear all books from the database.
+
+    Removes all records from the books table while keeping
+    the table structure intact.
+
+    Parameters:
+    -----------
+    conn : sqlite3.Connection
+        Active database connection
+    """
+    cursor = conn.cursor()
+
+    cursor.execute('DELETE FROM books')
+    conn.commit()
+
+    # The similarity index would otherwise keep pointing at deleted rows
+    db_path = database_path(conn)
+    if db_path:
+        remove_index(db_path)
+
+
+@profiling.profiled()
+def store_books(conn: sqlite3.Connection, books: List[Dict]):
+    """
+    Store books in the SQLite database.
+
+    Inserts each book from the list into the database.
+    Uses parameterized queries to prevent SQL injection.
+
+    Parameters:
+    -----------
+    conn : sqlite3.Connection
+        Active database connection
+    books : List[Dict]
+        List of book dictionaries with keys: title, author, publication_year
+    """
+    cursor = conn.cursor()
+
+    with metrics.db_call("store_books") as call:
+        for book in books:
+            cursor.execute('''
+                INSERT INTO books (title, author, publication_year)
+                VALUES (?, ?, ?)
+            ''', (book.get('title'), book.get('author'), book.get('publication_year')))
+
+        # Commit all inserts at once for efficiency
+        conn.commit()
+        call.rows = len(books)
+
+    print(f"✓ Stored {len(books)} books in the database.")
+
+
+def update_similarity_index(conn: sqlite3.Connection):
+    """
+    Vectorize the rows added since the last update into the database's
+    similar-titles index (``<database>.similar/``, see services.similarity).
+
+    Not called by store_books(): the index costs NumPy, extra time per row
+    and disk space, so callers opt in (``run.py sync --index``). In-memory
+    databases have no index; without NumPy it is skipped.
+    """
+    db_path = database_path(conn)
+    if not db_path:
+        return
+    try:
+        from services import similarity
+    except ImportError:
+        print("✗ NumPy is not installed; similar-titles index not updated")
+        return
+    with metrics.db_call("update_similarity_index") as call:
+        index = similarity.SimilarityIndex.open(index_path(db_path))
+        call.rows = similarity.add_sqlite_rows(index, conn)
+        # Large indexes get their cluster index now rather than on a query
+        index.build_clusters()
+
+
+def display_books(conn: sqlite3.Connection, limit: int = None):
+    """
+    Retrieve and display all books from the database in a formatted table.
+
+    Fetches books from the database and prints them in a nicely
+    formatted ASCII table with aligned columns.
+
+    Parameters:
+    -----------
+    conn : sqlite3.Connection
+        Active database connection
+    limit : int, optional
+        Maximum number of books to display (default: None = all books)
+    """
+    cursor = conn.cursor()
+
+    with metrics.db_call("display_books") as call:
+        # Execute query with optional LIMIT clause
+        if limit:
+            cursor.execute('SELECT id, title, author, publication_year FROM books LIMIT ?', (limit,))
+        else:
+            cursor.execute('SELECT id, title, author, publication_year FROM books')
+
+        books = cursor.fetchall()
+        call.rows = len(books)
+
+    # Print formatted table header
+    print("\n" + "=" * 70)
+    print(f"{'ID':<5} {'Title':<30} {'Author':<22} {'Year':<6}")
+    print("=" * 70)
+
+    # Print each book with truncated strings for alignment
+    for book in books:
+        # Truncate long titles and authors to fit column width
+        title = book[1][:28] + ".." if len(book[1]) > 30 else book[1]
+        author = book[2][:20] + ".." if len(book[2]) > 22 else book[2]
+        print(f"{book[0]:<5} {title:<30} {author:<22} {book[3]:<6}")
+
+    print("=" * 70)
+
+    # Get and display total count
+    cursor.execute('SELECT COUNT(*) FROM books')
+    total = cursor.fetchone()[0]
+
+    if limit and total > limit:
+        print(f"Showing {limit} of {total} books")
+    else:
+        print(f"Total: {total} books")
+
+
+def get_all_books(conn: sqlite3.Connection) -> List[Dict]:
+    """
+    Get all books as a list of dictionaries.
+
+    Fetches all books from the database and converts them
+    from tuple format to dictionary format.
+
+    Parameters:
+    -----------
+    conn : sqlite3.Connection
+        Active database connection
+
+    Returns:
+    --------
+    List[Dict]
+        List of book dictionaries with keys: id, title, author, publication_year
+    """
+    cursor = conn.cursor()
+
+    with metrics.db_call("get_all_books") as call:
+        cursor.execute('SELECT id, title, author, publication_year FROM books')
+        books = cursor.fetchall()
+        call.rows = len(books)
+
+    # Convert tuples to dictionaries for easier use
+    return [
+        {"id": b[0], "title": b[1], "author": b[2], "publication_year": b[3]}
+        for b in books
+    ]
@@ -0,0 +1,6 @@
+"""
+Waypoint patrol for turtle2.py: route files and the move_base route engine.
+
+ROS (rospy, actionlib, move_base_msgs) is only imported by the parts that
+talk to a real robot, so routes can be loaded and planned anywhere.
+"""
@@ -0,0 +1,163 @@
+"""
+Visiting-order optimizer for waypoint routes.
+
+The patrol used to visit stations in the order they were written down.
+``plan_route()`` reorders them to shorten each cycle:
+
+1. The pairwise distance matrix is computed once with NumPy.
+2. A nearest-neighbour tour gives a starting order.
+3. 2-opt reverses segments while that shortens the route. For each
+   segment start, every possible segment end is scored in one vectorized
+   expression over the distance matrix.
+
+A fixed start waypoint stays first and a fixed end waypoint stays last.
+A closed loop (``return_to_start``) is optimized including the leg back
+to the start. An open route without a fixed start tries every waypoint as
+the first one. Distances are straight-line, which is a good proxy on an
+open floor but ignores obstacles known only to move_base's planner.
+
+Example:
+--------
+>>> route = plan_route(load_route("stations.yaml"), start="dock")
+"""
+
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+
+from navigation.waypoints import Route, Waypoint
+
+# 2-opt moves must gain at least this much (metres) to count as improvements
+MIN_GAIN = 1e-9
+
+
+def distance_matrix(waypoints: Sequence[Waypoint]) -> np.ndarray:
+    """Pairwise planar distances between waypoints, shape (n, n)."""
+    points = np.array([(w.x, w.y) for w in waypoints], dtype=np.float64)
+    deltas = points[:, None, :] - points[None, :, :]
+    return np.hypot(deltas[..., 0], deltas[..., 1])
+
+
+def path_length(order: Sequence[int], dist: np.ndarray) -> float:
+    """Length of visiting ``order`` (node indices) in sequence."""
+    order = np.asarray(order)
+    return float(dist[order[:-1], order[1:]].sum())
+
+
+def route_length(route: Route) -> float:
+    """Length of one cycle of a route, including the way back if it loops."""
+    legs = route.legs()
+    return path_length(range(len(legs)), distance_matrix(legs))
+
+
+def nearest_neighbor(dist: np.ndarray, start: int, end: Optional[int] = None) -> List[int]:
+    """
+    Greedy order from ``start``, always visiting the closest unvisited node.
+
+    ``end``, if given, is left out of the greedy part and appended last.
+    """
+    remaining = np.ones(len(dist), dtype=bool)
+    remaining[start] = False
+    if end is not None:
+        remaining[end] = False
+    order = [start]
+    while remaining.any():
+        candidates = np.where(remaining, dist[order[-1]], np.inf)
+        nxt = int(np.argmin(candidates))
+        order.append(nxt)
+        remaining[nxt] = False
+    if end is not None:
+        order.append(end)
+    return order
+
+
+def two_opt(order: Sequence[int], dist: np.ndarray) -> List[int]:
+    """
+    Improve an order by segment reversals; the first and last node stay put.
+    """
+    order = np.array(order)
+    n = len(order)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, n - 2):
+            # Reversing order[i..j] swaps edges (a,b),(c,d) for (a,c),(b,d)
+            a, b = order[i - 1], order[i]
+            c, d = order[i + 1:n - 1], order[i + 2:n]
+            gain = dist[a, b] + dist[c, d] - dist[a, c] - dist[b, d]
+            k = int(np.argmax(gain))
+            if gain[k] > MIN_GAIN:
+                j = i + 1 + k
+                order[i:j + 1] = order[i:j + 1][::-1].copy()
+                improved = True
+    return order.tolist()
+
+
+def _index(waypoints: Sequence[Waypoint], which: Union[str, int, None]) -> Optional[int]:
+    if which is None or isinstance(which, int):
+        return which
+    for i, waypoint in enumerate(waypoints):
+        if waypoint.name == which:
+            return i
+    raise ValueError(f"Unknown waypoint: {which}")
+
+
+def plan_route(route: Route, start: Union[str, int, None] = None,
+               end: Union[str, int, None] = None) -> Route:
+    """
+    Return ``route`` with its waypoints in a short visiting order.
+
+    Parameters:
+    -----------
+    route : Route
+        Waypoints to visit (each once; a closed loop returns to the first)
+    start : str or int, optional
+        Waypoint (name or index) to visit first. Closed loops default to
+        their current first waypoint; open routes default to the best one.
+    end : str or int, optional
+        Waypoint to visit last (open routes only)
+
+    Returns:
+    --------
+    Route
+        Same waypoints, frame and loop flag, reordered
+    """
+    waypoints = list(route.waypoints)
+    if len(waypoints) < 3:
+        return route
+    start, end = _index(waypoints, start), _index(waypoints, end)
+    if route.return_to_start and end is not None:
+        raise ValueError("A closed loop ends where it starts; drop end or return_to_start")
+    if start is not None and start == end:
+        raise ValueError("start and end must be different waypoints")
+
+    n = len(waypoints)
+    original_allowed = start in (None, 0) and end in (None, n - 1)
+    dist = distance_matrix(waypoints)
+    if route.return_to_start:
+        # Close the loop by visiting a copy of the start node last
+        start = 0 if start is None else start
+        dist = np.vstack([dist, dist[start]])
+        dist = np.hstack([dist, dist[:, start:start + 1]])
+        end = n
+
+    if start is not None:
+        order = nearest_neighbor(dist, start, end)
+    else:
+        # Free start: keep the best greedy tour over every possible first stop
+        tours = [nearest_neighbor(dist, s, end) for s in range(n) if s != end]
+        order = min(tours, key=lambda tour: path_length(tour, dist))
+        # A dummy node at distance 0 from everything lets 2-opt move the start
+        dist = np.pad(dist, ((0, 1), (0, 1)))
+        order = [len(dist) - 1] + order
+
+    if end is None:
+        dist = np.pad(dist, ((0, 1), (0, 1)))
+        order = order + [len(dist) - 1]
+
+    order = [i for i in two_opt(order, dist) if i < n]
+    planned = route._replace(waypoints=[waypoints[i] for i in order])
+    # Keep the hand-written order unless the plan is actually shorter
+    if original_allowed and route_length(planned) >= route_length(route) - MIN_GAIN:
+        return route
+    return planned
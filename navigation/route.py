@@ -0,0 +1,189 @@
+"""
+Event-driven patrol over a waypoint route with a move_base action client.
+
+``RouteEngine`` builds one goal per waypoint up front and drives them
+with non-blocking ``send_goal`` calls. The client's done and feedback
+callbacks only post events to a queue; the thread calling ``run()``
+consumes them and sends the next goal the moment the previous one
+finishes, so there is no ``wait_for_result()`` per leg and no fixed
+sleep between legs. (Sending from the queue consumer rather than from
+inside the callback also keeps actionlib's own locks out of the way.)
+
+With a ``tolerance`` radius the next goal is sent as soon as feedback
+puts the robot within that distance of the current waypoint, instead of
+waiting for move_base to settle on it; the leg is then recorded as
+``PASSED``. The final leg of a run is always driven to completion.
+
+The engine only needs an object with SimpleActionClient's ``send_goal``
+/ ``cancel_goal`` interface, so goal construction and stamping are
+pluggable and ROS is imported only by the default factories.
+"""
+
+import queue
+import time
+from typing import Callable, Dict, List, Optional
+
+from navigation.waypoints import Route, Waypoint, distance
+
+# actionlib_msgs/GoalStatus values, so the engine does not need ROS
+GOAL_STATES = {0: "PENDING", 1: "ACTIVE", 2: "PREEMPTED", 3: "SUCCEEDED", 4: "ABORTED",
+               5: "REJECTED", 6: "PREEMPTING", 7: "RECALLING", 8: "RECALLED", 9: "LOST"}
+SUCCEEDED = 3
+
+# How often run() checks should_stop() while waiting for an event
+POLL_INTERVAL = 0.1
+
+
+def build_move_base_goal(waypoint: Waypoint, frame_id: str = "map"):
+    """Build a MoveBaseGoal for a waypoint (stamped later, at send time)."""
+    from move_base_msgs.msg import MoveBaseGoal
+
+    goal = MoveBaseGoal()
+    goal.target_pose.header.frame_id = frame_id
+    pose = goal.target_pose.pose
+    pose.position.x = waypoint.x
+    pose.position.y = waypoint.y
+    pose.orientation.z = waypoint.qz
+    pose.orientation.w = waypoint.qw
+    return goal
+
+
+def stamp_move_base_goal(goal):
+    """Refresh the header stamp of a prebuilt goal just before sending it."""
+    import rospy
+
+    goal.target_pose.header.stamp = rospy.Time.now()
+
+
+def feedback_position(feedback):
+    """(x, y) of the robot from a MoveBaseFeedback message."""
+    position = feedback.base_position.pose.position
+    return position.x, position.y
+
+
+class RouteEngine:
+    """
+    Drive a route one or more times through a move_base action client.
+
+    Parameters:
+    -----------
+    client : actionlib.SimpleActionClient
+        Connected client (``wait_for_server()`` already done)
+    route : Route
+        Waypoints to visit, see navigation.waypoints.load_route()
+    goal_factory : callable, optional
+        ``(waypoint, frame_id) -> goal`` (default: build_move_base_goal)
+    stamp : callable, optional
+        Called with a goal right before it is sent (default:
+        stamp_move_base_goal); None to send goals as built
+    tolerance : float, optional
+        Send the next goal once the robot is this close (metres) to the
+        current waypoint; 0 waits for every goal to finish (default: 0)
+    dwell : float, optional
+        Seconds to stay at each reached waypoint (default: 0)
+    should_stop : callable, optional
+        Polled while waiting; returning True cancels the goal in flight
+        and ends the run (e.g. ``rospy.is_shutdown``)
+    verbose : bool, optional
+        Print one line per leg (default: True)
+    """
+
+    def __init__(self, client, route: Route, goal_factory: Callable = build_move_base_goal,
+                 stamp: Optional[Callable] = stamp_move_base_goal, tolerance: float = 0.0,
+                 dwell: float = 0.0, should_stop: Optional[Callable[[], bool]] = None,
+                 verbose: bool = True):
+        self.client = client
+        self.route = route
+        self.legs = route.legs()
+        # Built once; only the stamp changes from one send to the next
+        self.goals = [goal_factory(waypoint, route.frame_id) for waypoint in self.legs]
+        self.stamp = stamp
+        self.tolerance = tolerance
+        self.dwell = dwell
+        self.should_stop = should_stop or (lambda: False)
+        self.verbose = verbose
+        self.results: List[Dict] = []
+        self._events: "queue.Queue" = queue.Queue()
+        self._active = None
+        self._near = set()
+
+    def sequence(self, cycles: int):
+        """(cycle, leg index) pairs driven by run(cycles)."""
+        pairs = []
+        for cycle in range(cycles):
+            # A closed loop already ends on the first waypoint
+            first = 1 if cycle and self.route.return_to_start else 0
+            pairs.extend((cycle, index) for index in range(first, len(self.legs)))
+        return pairs
+
+    def _send(self, token):
+        goal = self.goals[token[1]]
+        if self.stamp:
+            self.stamp(goal)
+        self._active = token
+        self.results.append({"cycle": token[0], "leg": token[1],
+                             "waypoint": self.legs[token[1]].name,
+                             "sent": time.monotonic(), "finished": None, "state": None})
+        feedback_cb = None
+        if self.tolerance:
+            feedback_cb = lambda feedback: self._on_feedback(token, feedback)
+        self.client.send_goal(goal,
+                              done_cb=lambda state, result: self._events.put(("done", token, state)),
+                              feedback_cb=feedback_cb)
+
+    def _on_feedback(self, token, feedback):
+        if token != self._active or token in self._near:
+            return
+        if distance(self.legs[token[1]], feedback_position(feedback)) <= self.tolerance:
+            self._near.add(token)
+            self._events.put(("near", token, None))
+
+    def run(self, cycles: int = 1) -> List[Dict]:
+        """
+        Drive the route ``cycles`` times back to back.
+
+        Returns:
+        --------
+        List[Dict]
+            One record per leg: cycle, leg, waypoint, sent / finished
+            (time.monotonic() seconds) and state ('SUCCEEDED', 'ABORTED',
+            ..., or 'PASSED' when left early within the tolerance)
+        """
+        pairs = self.sequence(cycles)
+        if not pairs:
+            return self.results
+        position = 0
+        self._send(pairs[0])
+
+        while True:
+            try:
+                kind, token, state = self._events.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                if self.should_stop():
+                    self.client.cancel_goal()
+                    break
+                continue
+            # Ignore events of goals that were already superseded
+            if token != self._active:
+                continue
+            last = position == len(pairs) - 1
+            if kind == "near" and last:
+                continue
+
+            record = self.results[-1]
+            record["finished"] = time.monotonic()
+            record["state"] = "PASSED" if kind == "near" else GOAL_STATES.get(state, str(state))
+            if self.verbose:
+                mark = "✗" if record["state"] not in ("SUCCEEDED", "PASSED") else "✓"
+                print(f"{mark} {record['waypoint']}: {record['state'].lower()} "
+                      f"(cycle {token[0] + 1}, leg {token[1] + 1}/{len(self.legs)}, "
+                      f"{record['finished'] - record['sent']:.2f}s)")
+
+            position += 1
+            if last:
+                self._active = None
+                break
+            if self.dwell and kind == "done":
+                time.sleep(self.dwell)
+            self._send(pairs[position])
+        return self.results
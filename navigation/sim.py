@@ -0,0 +1,198 @@
+"""
+Simulated move_base action server for running the patrol without ROS.
+
+``SimulatedMoveBase`` has the client-side interface of
+``actionlib.SimpleActionClient`` used by turtle2.py and RouteEngine:
+``wait_for_server``, ``send_goal`` (done / active / feedback callbacks),
+``wait_for_result``, ``get_state``, ``get_result`` and ``cancel_goal``.
+It follows the same rules: sending a goal supersedes the one in flight
+(whose callbacks then stop firing), and cancelling reports PREEMPTED,
+to the cancelled goal's done callback as well as through ``get_state``.
+
+Each goal makes the robot drive in a straight line from where it is
+towards the goal at ``speed`` m/s, publishing feedback positions at
+``feedback_hz``. With probability ``failure_rate`` a goal is ABORTED
+part-way, as move_base does when it cannot find a path. ``time_scale``
+runs the simulation faster than real time (10 means ten times faster),
+so timing figures measured against it are wall-clock seconds scaled by
+1 / time_scale.
+
+Example:
+--------
+>>> client = SimulatedMoveBase(speed=0.5, failure_rate=0.05, time_scale=20)
+>>> RouteEngine(client, route, goal_factory=sim_goal, stamp=None).run(3)
+"""
+
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import Optional, Tuple
+
+from navigation.route import GOAL_STATES
+from navigation.waypoints import Waypoint
+
+PENDING, ACTIVE, PREEMPTED, SUCCEEDED, ABORTED = 0, 1, 2, 3, 4
+
+# Status of a client that never sent a goal (actionlib's SimpleGoalState.LOST)
+LOST = 9
+
+
+def sim_goal(waypoint: Waypoint, frame_id: str = "map"):
+    """Build a goal shaped like MoveBaseGoal, without ROS messages."""
+    position = SimpleNamespace(x=waypoint.x, y=waypoint.y, z=0.0)
+    orientation = SimpleNamespace(x=0.0, y=0.0, z=waypoint.qz, w=waypoint.qw)
+    header = SimpleNamespace(frame_id=frame_id, stamp=None)
+    return SimpleNamespace(target_pose=SimpleNamespace(
+        header=header, pose=SimpleNamespace(position=position, orientation=orientation)))
+
+
+def _feedback(x: float, y: float):
+    # Same attribute path as MoveBaseFeedback.base_position
+    return SimpleNamespace(base_position=SimpleNamespace(
+        pose=SimpleNamespace(position=SimpleNamespace(x=x, y=y, z=0.0))))
+
+
+class SimulatedMoveBase:
+    """
+    In-process stand-in for ``SimpleActionClient('move_base', MoveBaseAction)``.
+
+    Parameters:
+    -----------
+    speed : float, optional
+        Travel speed in m/s (default: 0.5)
+    failure_rate : float, optional
+        Probability that a goal is aborted (default: 0)
+    start : (float, float), optional
+        Initial robot position (default: (0, 0))
+    time_scale : float, optional
+        Simulation speed-up over real time (default: 1)
+    feedback_hz : float, optional
+        Feedback messages per simulated second (default: 10)
+    seed : int, optional
+        Seed for the failure draws, for repeatable runs (default: None)
+    """
+
+    def __init__(self, speed: float = 0.5, failure_rate: float = 0.0,
+                 start: Tuple[float, float] = (0.0, 0.0), time_scale: float = 1.0,
+                 feedback_hz: float = 10.0, seed: Optional[int] = None):
+        self.speed = speed
+        self.failure_rate = failure_rate
+        self.time_scale = time_scale
+        self.feedback_hz = feedback_hz
+        self.position = start
+        self.distance_travelled = 0.0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._state = LOST
+        self._done_cb = None
+        self._done = threading.Event()
+        self._done.set()
+
+    # -- SimpleActionClient interface ------------------------------------------
+
+    def wait_for_server(self, timeout=None) -> bool:
+        return True
+
+    def send_goal(self, goal, done_cb=None, active_cb=None, feedback_cb=None):
+        target = self._goal_xy(goal)
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            self._state = PENDING
+            self._done_cb = done_cb
+            self._done.clear()
+            # Decide up front whether (and how far along) this goal fails
+            fail_at = self._rng.random() if self._rng.random() < self.failure_rate else None
+        threading.Thread(target=self._drive, name="sim-move-base", daemon=True,
+                         args=(generation, target, fail_at, done_cb, active_cb,
+                               feedback_cb)).start()
+
+    def wait_for_result(self, timeout=None) -> bool:
+        seconds = None
+        if timeout is not None:
+            # rospy.Duration or plain seconds
+            seconds = timeout.to_sec() if hasattr(timeout, "to_sec") else float(timeout)
+        return self._done.wait(seconds or None)
+
+    def get_state(self) -> int:
+        return self._state
+
+    def get_result(self):
+        # MoveBaseResult has no fields
+        return SimpleNamespace() if self._state == SUCCEEDED else None
+
+    def cancel_goal(self):
+        with self._lock:
+            if self._state not in (PENDING, ACTIVE):
+                return
+            self._generation += 1
+            self._state = PREEMPTED
+            done_cb, self._done_cb = self._done_cb, None
+            self._done.set()
+        # Outside the lock: the callback may send the next goal
+        if done_cb:
+            done_cb(PREEMPTED, None)
+
+    cancel_all_goals = cancel_goal
+
+    # -- simulation ------------------------------------------------------------
+
+    @staticmethod
+    def _goal_xy(goal) -> Tuple[float, float]:
+        if hasattr(goal, "target_pose"):
+            position = goal.target_pose.pose.position
+            return position.x, position.y
+        return goal.x, goal.y
+
+    def _current(self, generation: int) -> bool:
+        return generation == self._generation
+
+    def _drive(self, generation, target, fail_at, done_cb, active_cb, feedback_cb):
+        with self._lock:
+            if not self._current(generation):
+                return
+            self._state = ACTIVE
+            start = self.position
+        if active_cb:
+            active_cb()
+
+        dx, dy = target[0] - start[0], target[1] - start[1]
+        length = (dx * dx + dy * dy) ** 0.5
+        duration = length / self.speed if self.speed > 0 else 0.0
+        stop_at = duration * fail_at if fail_at is not None else duration
+        step = 1.0 / self.feedback_hz
+        began = time.monotonic()
+
+        while True:
+            # Simulated seconds since this goal started
+            elapsed = min((time.monotonic() - began) * self.time_scale, stop_at)
+            fraction = elapsed / duration if duration else 1.0
+            with self._lock:
+                if not self._current(generation):
+                    return
+                previous = self.position
+                self.position = (start[0] + dx * fraction, start[1] + dy * fraction)
+                self.distance_travelled += ((self.position[0] - previous[0]) ** 2 +
+                                            (self.position[1] - previous[1]) ** 2) ** 0.5
+                position = self.position
+            if elapsed >= stop_at:
+                break
+            if feedback_cb:
+                feedback_cb(_feedback(*position))
+            time.sleep(min(step, stop_at - elapsed) / self.time_scale)
+
+        with self._lock:
+            if not self._current(generation):
+                return
+            self._state = ABORTED if fail_at is not None else SUCCEEDED
+            state = self._state
+            self._done_cb = None
+            self._done.set()
+        if done_cb:
+            done_cb(state, SimpleNamespace() if state == SUCCEEDED else None)
+
+    def __repr__(self):
+        return (f"SimulatedMoveBase(speed={self.speed}, failure_rate={self.failure_rate}, "
+                f"state={GOAL_STATES.get(self._state)})")
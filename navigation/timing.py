@@ -0,0 +1,90 @@
+"""
+Timing of patrol runs, from RouteEngine results.
+
+For every leg:
+
+- ``latency_s``   send_goal -> result (or early hand-off within tolerance)
+- ``idle_s``      previous leg's result -> this leg's send_goal, i.e. time
+                  the robot had no goal (dwell, stamping, dispatch overhead)
+
+and for the last leg of each cycle ``cycle_s``, the time from the end of
+the previous cycle (or the first send) to the end of this one.
+
+``write_timing_csv()`` stores one row per leg so runs can be compared in
+a spreadsheet or with pandas.
+"""
+
+import csv
+from typing import Dict, List
+
+TIMING_FIELDS = ("cycle", "leg", "waypoint", "state", "sent_s", "latency_s", "idle_s",
+                 "cycle_s")
+
+
+def leg_timings(results: List[Dict], time_scale: float = 1.0) -> List[Dict]:
+    """
+    Turn RouteEngine.run() records into per-leg timing rows.
+
+    Parameters:
+    -----------
+    results : List[Dict]
+        Records returned by RouteEngine.run()
+    time_scale : float, optional
+        Multiply wall-clock durations by this (the simulator's speed-up),
+        so the figures are in simulated seconds (default: 1)
+
+    Returns:
+    --------
+    List[Dict]
+        One row per finished leg with the TIMING_FIELDS keys; times are
+        seconds relative to the first send_goal
+    """
+    finished = [r for r in results if r["finished"] is not None]
+    if not finished:
+        return []
+    origin = finished[0]["sent"]
+    rows = []
+    previous_end = None
+    cycle_start = origin
+    for i, record in enumerate(finished):
+        idle = record["sent"] - previous_end if previous_end is not None else 0.0
+        row = {
+            "cycle": record["cycle"] + 1,
+            "leg": record["leg"] + 1,
+            "waypoint": record["waypoint"],
+            "state": record["state"],
+            "sent_s": round((record["sent"] - origin) * time_scale, 4),
+            "latency_s": round((record["finished"] - record["sent"]) * time_scale, 4),
+            "idle_s": round(idle * time_scale, 4),
+            "cycle_s": "",
+        }
+        last_of_cycle = i == len(finished) - 1 or finished[i + 1]["cycle"] != record["cycle"]
+        if last_of_cycle:
+            row["cycle_s"] = round((record["finished"] - cycle_start) * time_scale, 4)
+            cycle_start = record["finished"]
+        rows.append(row)
+        previous_end = record["finished"]
+    return rows
+
+
+def write_timing_csv(rows: List[Dict], path: str):
+    """Write leg_timings() rows to a CSV file."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=TIMING_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def timing_summary(rows: List[Dict]) -> Dict:
+    """Totals over leg_timings() rows: legs, failures, latency, idle and cycle times."""
+    cycles = [r["cycle_s"] for r in rows if r["cycle_s"] != ""]
+    latencies = [r["latency_s"] for r in rows]
+    return {
+        "legs": len(rows),
+        "failed": sum(r["state"] not in ("SUCCEEDED", "PASSED") for r in rows),
+        "mean_latency_s": round(sum(latencies) / len(latencies), 4) if rows else 0.0,
+        "total_idle_s": round(sum(r["idle_s"] for r in rows), 4),
+        "max_idle_s": max((r["idle_s"] for r in rows), default=0.0),
+        "cycle_s": cycles,
+        "mean_cycle_s": round(sum(cycles) / len(cycles), 4) if cycles else 0.0,
+    }
@@ -0,0 +1,112 @@
+"""
+Waypoint files for the patrol in turtle2.py.
+
+A route is a list of named poses in the map frame. It can be written as
+YAML:
+
+    frame_id: map
+    return_to_start: true
+    waypoints:
+      - {name: dock, x: -1.58, y: -0.452, qw: 0.00247}
+      - {name: east, x: 1.48, y: -0.605, qw: 0.00247}
+
+(or just the list under ``waypoints``), or as CSV with a header row:
+
+    name,x,y,qz,qw
+    dock,-1.58,-0.452,0,0.00247
+
+``qz``/``qw`` are the yaw part of the orientation quaternion and default
+to 0 and 1. ``return_to_start`` appends the first waypoint at the end so
+every patrol cycle is a closed loop.
+"""
+
+import csv
+import os
+from typing import List, NamedTuple, Tuple
+
+# The patrol turtle2.py has always driven
+DEFAULT_ROUTE_FILE = os.path.join(os.path.dirname(__file__), "patrol.yaml")
+
+
+class Waypoint(NamedTuple):
+    name: str
+    x: float
+    y: float
+    qz: float = 0.0
+    qw: float = 1.0
+
+
+class Route(NamedTuple):
+    waypoints: List[Waypoint]
+    frame_id: str = "map"
+    return_to_start: bool = False
+
+    def legs(self) -> List[Waypoint]:
+        """Waypoints in driving order, closing the loop if requested."""
+        if self.return_to_start and len(self.waypoints) > 1:
+            return self.waypoints + [self.waypoints[0]]
+        return list(self.waypoints)
+
+
+def _waypoint(row: dict, index: int) -> Waypoint:
+    try:
+        return Waypoint(name=str(row.get("name") or f"wp{index}"),
+                        x=float(row["x"]), y=float(row["y"]),
+                        qz=float(row.get("qz") or 0.0),
+                        qw=float(row["qw"]) if row.get("qw") not in (None, "") else 1.0)
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid waypoint #{index}: {row!r} ({e})") from e
+
+
+def _load_yaml(path: str):
+    try:
+        import yaml
+    except ImportError:
+        raise SystemExit("✗ YAML waypoint files need PyYAML: pip install pyyaml")
+
+    with open(path, encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    if isinstance(data, list):
+        data = {"waypoints": data}
+    return data
+
+
+def load_route(path: str = DEFAULT_ROUTE_FILE, return_to_start: bool = None) -> Route:
+    """
+    Load a route from a YAML or CSV waypoint file.
+
+    Parameters:
+    -----------
+    path : str, optional
+        ``.yaml``/``.yml`` or ``.csv`` file (default: DEFAULT_ROUTE_FILE)
+    return_to_start : bool, optional
+        Override the file's ``return_to_start`` (CSV files default to False)
+
+    Returns:
+    --------
+    Route
+
+    Raises:
+    -------
+    ValueError
+        If the file has no waypoints or a waypoint is malformed
+    """
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            data = {"waypoints": list(csv.DictReader(f))}
+    else:
+        data = _load_yaml(path)
+
+    rows = data.get("waypoints") or []
+    if not rows:
+        raise ValueError(f"No waypoints in {path}")
+    if return_to_start is None:
+        return_to_start = bool(data.get("return_to_start", False))
+    return Route(waypoints=[_waypoint(row, i) for i, row in enumerate(rows)],
+                 frame_id=str(data.get("frame_id", "map")),
+                 return_to_start=return_to_start)
+
+
+def distance(a: Waypoint, b: Tuple[float, float]) -> float:
+    """Planar distance between a waypoint and an (x, y) position."""
+    return ((a.x - b[0]) ** 2 + (a.y - b[1]) ** 2) ** 0.5
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Command-line entry point for the Books Application.
+
+Subcommands:
+    serve   Run the API server (blocking; Flask, or ASGI with --asgi)
+    sync    Fetch books from the API and store them in SQLite
+    show    Print the books stored in SQLite
+    export  Stream any SQLite table to CSV or NDJSON (optionally gzipped)
+
+Running without a subcommand performs the full workflow: start the API
+server in the background, sync the catalog into the database and display it.
+
+Heavy dependencies are imported inside the subcommand that needs them:
+``show`` only touches sqlite3, ``sync`` adds requests, and only ``serve``
+(or a sync with ``--start-server``) imports Flask.
+"""
+
+import argparse
+import socket
+import sqlite3
+import sys
+import time
+from typing import Dict
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5000
+
+
+def wait_for_server(host: str, port: int, timeout: float = 10.0) -> bool:
+    """
+    Wait until something accepts TCP connections on ``host:port``.
+
+    Returns:
+    --------
+    bool
+        True if the server came up before the timeout
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.05)
+    return False
+
+
+def start_local_server(host: str, port: int, catalog_size: int):
+    """
+    Start the API server in a background thread and wait until it is reachable.
+    """
+    from api import catalog, server
+
+    catalog.CATALOG_SIZE = catalog_size
+    server.start_server_thread(host, port)
+    if not wait_for_server(host, port):
+        raise SystemExit(f"✗ API server did not start on {host}:{port}")
+    print(f"✓ API server running at http://{host}:{port}")
+
+
+# =============================================================================
+# SUBCOMMANDS
+# =============================================================================
+
+def cmd_serve(args) -> int:
+    from api import catalog
+
+    catalog.CATALOG_SIZE = args.catalog_size
+    if args.asgi:
+        from api import asgi
+        asgi.run_asgi_server(args.host, args.port, db_path=args.db)
+    else:
+        from api import server
+        server.run_server(args.host, args.port)
+    return 0
+
+
+def cmd_sync(args) -> int:
+    from db.database import (create_database, clear_database, store_books,
+                             update_similarity_index)
+    from services.api_client import fetch_books_from_api
+
+    if args.start_server:
+        start_local_server(args.host, args.port, args.catalog_size)
+
+    api_url = args.api_url or f"http://{args.host}:{args.port}/books"
+    books = fetch_books_from_api(api_url)
+    if not books:
+        print("✗ No books fetched from API")
+        return 1
+    print(f"✓ Fetched {len(books)} books from API")
+
+    conn = create_database(args.db)
+    try:
+        if not args.append:
+            # Clear any existing data so repeated syncs do not duplicate rows
+            clear_database(conn)
+        store_books(conn, books)
+        if getattr(args, "index", False):
+            update_similarity_index(conn)
+            print("✓ Updated the similar-titles index")
+    finally:
+        conn.close()
+    return 0
+
+
+def cmd_show(args) -> int:
+    from db.database import create_database, display_books
+
+    conn = create_database(args.db)
+    try:
+        display_books(conn, limit=args.limit)
+    finally:
+        conn.close()
+    return 0
+
+
+def cmd_export(args) -> int:
+    from db.export import export_table
+
+    columns = [c.strip() for c in args.columns.split(",")] if args.columns else None
+    try:
+        count = export_table(args.database, args.table, args.output, fmt=args.format,
+                             columns=columns, where=args.where, params=args.param,
+                             compress=True if args.gzip else None,
+                             batch_size=args.batch_size)
+    except (ValueError, sqlite3.Error) as e:
+        print(f"✗ Export failed: {e}", file=sys.stderr)
+        return 1
+    print(f"✓ Exported {count} rows from {args.table}", file=sys.stderr)
+    return 0
+
+
+def cmd_all(args) -> int:
+    print("=" * 50)
+    print("  📚 Books Application")
+    print("=" * 50)
+
+    print("\n[1/3] Starting API server...")
+    start_local_server(args.host, args.port, args.catalog_size)
+
+    print("\n[2/3] Syncing books into the database...")
+    args.start_server = False
+    status = cmd_sync(args)
+    if status:
+        return status
+
+    print("\n[3/3] 📖 Books in Database:")
+    cmd_show(args)
+
+    print("\n" + "=" * 50)
+    print("  ✓ Application completed successfully!")
+    print("=" * 50)
+    return 0
+
+
+# =============================================================================
+# ARGUMENT PARSING
+# =============================================================================
+
+def shared_options(subcommand: bool = False) -> Dict[str, argparse.ArgumentParser]:
+    """
+    Parent parsers for the options accepted both before and after a
+    subcommand.
+
+    A subparser writes its defaults over the values the main parser has
+    already parsed, so with real defaults in both places
+    ``run.py --db x.db show`` would lose ``--db``. The subcommand copies
+    (``subcommand=True``) therefore default to argparse.SUPPRESS and only
+    set an option when it is given; the main parser supplies the defaults.
+    """
+    def default(value):
+        return argparse.SUPPRESS if subcommand else value
+
+    server_opts = argparse.ArgumentParser(add_help=False)
+    server_opts.add_argument("--host", default=default(DEFAULT_HOST),
+                             help=f"API server host (default: {DEFAULT_HOST})")
+    server_opts.add_argument("--port", type=int, default=default(DEFAULT_PORT),
+                             help=f"API server port (default: {DEFAULT_PORT})")
+    server_opts.add_argument("--catalog-size", type=int, default=default(100),
+                             help="number of books the server generates (default: 100)")
+
+    db_opts = argparse.ArgumentParser(add_help=False)
+    db_opts.add_argument("--db", default=default(None),
+                         help="SQLite database path (default: ./books.db)")
+
+    sync_opts = argparse.ArgumentParser(add_help=False)
+    sync_opts.add_argument("--api-url", default=default(None),
+                           help="books endpoint to fetch (default: http://HOST:PORT/books)")
+    sync_opts.add_argument("--append", action="store_true", default=default(False),
+                           help="keep existing rows instead of clearing the table first")
+
+    show_opts = argparse.ArgumentParser(add_help=False)
+    show_opts.add_argument("--limit", type=int, default=default(20),
+                           help="maximum rows to display, 0 for all (default: 20)")
+
+    profile_opts = argparse.ArgumentParser(add_help=False)
+    profile_opts.add_argument("--profile", action="store_true", default=default(False),
+                              help="profile sampled requests and every fetch/store run "
+                                   "with cProfile (also BOOKS_PROFILE=1)")
+    profile_opts.add_argument("--profile-rate", type=float, default=default(None),
+                              help="fraction of HTTP requests to profile (default: 0.01)")
+    profile_opts.add_argument("--profile-dir", default=default(None),
+                              help="directory for .pstats files (default: ./profiles)")
+
+    return {"server": server_opts, "db": db_opts, "sync": sync_opts,
+            "show": show_opts, "profile": profile_opts}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    # Without a subcommand the full workflow runs, so it accepts every option
+    opts = shared_options()
+    parser = argparse.ArgumentParser(description="Books Application",
+                                     parents=list(opts.values()))
+    parser.set_defaults(func=cmd_all)
+
+    sub = shared_options(subcommand=True)
+    subparsers = parser.add_subparsers(dest="command")
+
+    serve = subparsers.add_parser("serve", parents=[sub["server"], sub["profile"]],
+                                  help="run the API server")
+    serve.add_argument("--asgi", action="store_true",
+                       help="serve the async (ASGI) app with uvicorn instead of Flask")
+    serve.add_argument("--db", default=argparse.SUPPRESS,
+                       help="with --asgi, serve books from this SQLite database "
+                            "instead of the generated catalog")
+    serve.set_defaults(func=cmd_serve)
+
+    sync = subparsers.add_parser("sync", parents=[sub["server"], sub["db"], sub["sync"],
+                                          sub["profile"]],
+                                 help="fetch books from the API into SQLite")
+    sync.add_argument("--start-server", action="store_true",
+                      help="start a local API server in the background first")
+    sync.add_argument("--index", action="store_true",
+                      help="also update the similar-titles index next to the database "
+                           "(needs NumPy)")
+    sync.set_defaults(func=cmd_sync)
+
+    show = subparsers.add_parser("show", parents=[sub["db"], sub["show"]],
+                                 help="display the books stored in SQLite")
+    show.set_defaults(func=cmd_show)
+
+    export = subparsers.add_parser("export", help="stream a SQLite table to CSV or NDJSON")
+    export.add_argument("database", help="SQLite database file, e.g. users.db or books.db")
+    export.add_argument("table", help="table to export")
+    export.add_argument("-o", "--output", default="-",
+                        help="output file, '-' for stdout; '.gz' implies --gzip (default: -)")
+    export.add_argument("--format", choices=("csv", "ndjson"), default="csv",
+                        help="output format (default: csv)")
+    export.add_argument("--columns", default=None,
+                        help="comma-separated columns to export (default: all)")
+    export.add_argument("--where", default=None,
+                        help="SQL filter, e.g. \"publication_year > ?\"")
+    export.add_argument("--param", action="append", default=[],
+                        help="value for a ? placeholder in --where (repeatable)")
+    export.add_argument("--gzip", action="store_true", help="gzip-compress the output")
+    export.add_argument("--batch-size", type=int, default=10_000,
+                        help="rows per fetchmany batch (default: 10000)")
+    export.set_defaults(func=cmd_export)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if getattr(args, "profile", None):
+        from services import profiling
+        profiling.configure(request_rate=args.profile_rate, output_dir=args.profile_dir)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
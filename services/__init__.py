@@ -0,0 +1,16 @@
+"""
+Client-side services for the Books Application.
+
+``fetch_books_from_api`` is resolved lazily so importing this package
+(for example for ``services.metrics``) does not import requests.
+"""
+
+import importlib
+
+__all__ = ["API_URL", "fetch_books_from_api"]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return getattr(importlib.import_module("services.api_client"), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,59 @@
+"""
+HTTP client for fetching book data from the Books API.
+"""
+
+import time
+from typing import List, Dict
+
+import requests
+
+from services import metrics, profiling
+
+# Define the API URL constant
+API_URL = "http://127.0.0.1:5000/books"
+
+
+@profiling.profiled()
+def fetch_books_from_api(api_url: str) -> List[Dict]:
+    """
+    Fetch books data from external REST API.
+
+    Makes an HTTP GET request to the specified URL and parses
+    the JSON response into a list of book dictionaries.
+
+    Parameters:
+    -----------
+    api_url : str
+        The full URL of the API endpoint (e.g., 'http://127.0.0.1:5000/books')
+
+    Returns:
+    --------
+    List[Dict]
+        List of book dictionaries from the API, or empty list if error occurs
+
+    Error Handling:
+    ---------------
+    - Catches all request exceptions (network errors, timeouts, etc.)
+    - Returns empty list on failure instead of raising exception
+    - Prints error message for debugging
+    """
+    start = time.perf_counter()
+    nbytes = 0
+    try:
+        # Make GET request with 10-second timeout
+        response = requests.get(api_url, timeout=10)
+        nbytes = len(response.content)
+
+        # Raise exception for bad status codes (4xx, 5xx)
+        response.raise_for_status()
+
+        # Parse JSON response and return
+        books = response.json()
+        metrics.record_fetch(time.perf_counter() - start, nbytes, ok=True)
+        return books
+
+    except requests.RequestException as e:
+        # Handle any request-related errors gracefully
+        metrics.record_fetch(time.perf_counter() - start, nbytes, ok=False)
+        print(f"✗ Error fetching data from API: {e}")
+        return []
@@ -0,0 +1,31 @@
+"""
+Where a SQLite database keeps its similar-titles index.
+
+Standard library only, so db.database can find (and delete) the index
+without importing NumPy; services.similarity uses the same helpers.
+"""
+
+import shutil
+import sqlite3
+from typing import Optional
+
+# Directory next to a SQLite database holding its index
+INDEX_SUFFIX = ".similar"
+
+
+def database_path(conn: sqlite3.Connection) -> Optional[str]:
+    """File behind a connection's main database, or None for ':memory:'."""
+    for _, name, file_path in conn.execute("PRAGMA database_list"):
+        if name == "main":
+            return file_path or None
+    return None
+
+
+def index_path(db_path: str) -> str:
+    """Directory of the similarity index kept next to ``db_path``."""
+    return db_path + INDEX_SUFFIX
+
+
+def remove_index(db_path: str):
+    """Delete the similarity index of a database, if any."""
+    shutil.rmtree(index_path(db_path), ignore_errors=True)
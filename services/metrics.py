@@ -0,0 +1,308 @@
+"""
+Low-overhead, in-process metrics for the Books Application.
+
+Counters and latency histograms are kept in plain Python objects guarded
+by a lock each, so recording a sample costs a dictionary lookup and a few
+additions. The collected values can be read in two ways:
+
+- ``render_prometheus()`` for the ``/metrics`` route (Prometheus text format)
+- ``snapshot()`` for batch runs that want a plain dictionary
+
+Example:
+--------
+>>> from services import metrics
+>>> with metrics.db_call("store_books") as call:
+...     call.rows = 100
+>>> metrics.snapshot()["books_db_rows_total"]
+{'operation="store_books"': 100}
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# Latency buckets in seconds (1 ms up to 1 minute)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+                   0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value) -> str:
+    """Escape a label value as required by the text exposition format."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames: Sequence[str], values: Tuple) -> str:
+    """Render label pairs as ``name="value",...`` (without braces)."""
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values))
+
+
+def _format_value(value: float) -> str:
+    """Render integers without a trailing ``.0`` and floats with full precision."""
+    if isinstance(value, float) and not value.is_integer():
+        return repr(value)
+    return str(int(value))
+
+
+class Counter:
+    """
+    Monotonically increasing value, optionally split by labels.
+
+    Parameters:
+    -----------
+    name : str
+        Metric name, e.g. 'books_http_requests_total'
+    documentation : str
+        One-line description used for the ``# HELP`` line
+    labelnames : Sequence[str], optional
+        Names of the labels every sample must provide
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        """Add ``amount`` to the series identified by ``labels``."""
+        key = tuple(labels[n] for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        """Return ``(suffix, labels, value)`` tuples for rendering."""
+        with self._lock:
+            items = list(self._values.items())
+        return [("", _format_labels(self.labelnames, key), value) for key, value in items]
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            items = list(self._values.items())
+        return {_format_labels(self.labelnames, key): value for key, value in items}
+
+
+class Histogram:
+    """
+    Distribution of observed values (typically durations in seconds).
+
+    Each labelled series stores one count per bucket plus the running
+    sum and count, which is all Prometheus needs to derive percentiles.
+
+    Parameters:
+    -----------
+    name : str
+        Metric name, e.g. 'books_http_request_duration_seconds'
+    documentation : str
+        One-line description used for the ``# HELP`` line
+    labelnames : Sequence[str], optional
+        Names of the labels every sample must provide
+    buckets : Sequence[float], optional
+        Upper bounds of the buckets (default: DEFAULT_BUCKETS)
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Series layout: [bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        """Record one observation in the series identified by ``labels``."""
+        key = tuple(labels[n] for n in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        """Return ``(suffix, labels, value)`` tuples for rendering."""
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._series.items()]
+
+        rows = []
+        for key, series in items:
+            base = _format_labels(self.labelnames, key)
+            prefix = base + "," if base else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                rows.append(("_bucket", f'{prefix}le="{bound}"', cumulative))
+            cumulative += series[len(self.buckets)]
+            rows.append(("_bucket", f'{prefix}le="+Inf"', cumulative))
+            rows.append(("_sum", base, series[-1]))
+            rows.append(("_count", base, cumulative))
+        return rows
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._series.items()]
+
+        result = {}
+        for key, series in items:
+            count = sum(series[:-1])
+            result[_format_labels(self.labelnames, key)] = {
+                "count": count,
+                "sum": series[-1],
+                "mean": series[-1] / count if count else 0.0,
+                "buckets": dict(zip([str(b) for b in self.buckets] + ["+Inf"], series[:-1])),
+            }
+        return result
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics that is rendered and snapshotted together.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format (0.0.4)."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in metric.samples():
+                label_part = f"{{{labels}}}" if labels else ""
+                lines.append(f"{metric.name}{suffix}{label_part} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Return every metric as a plain dictionary keyed by metric name."""
+        return {name: metric.snapshot() for name, metric in list(self._metrics.items())}
+
+    def reset(self):
+        """Zero every metric, e.g. between two batch runs."""
+        for metric in list(self._metrics.values()):
+            metric.reset()
+
+
+# =============================================================================
+# DEFAULT REGISTRY AND APPLICATION METRICS
+# =============================================================================
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "books_http_requests_total", "HTTP requests handled, by route and status.",
+    ("route", "method", "status"))
+HTTP_LATENCY = REGISTRY.histogram(
+    "books_http_request_duration_seconds", "HTTP request latency, by route.",
+    ("route",))
+
+DB_CALLS = REGISTRY.counter(
+    "books_db_calls_total", "Database calls, by operation.", ("operation",))
+DB_ROWS = REGISTRY.counter(
+    "books_db_rows_total", "Rows written or read, by operation.", ("operation",))
+DB_LATENCY = REGISTRY.histogram(
+    "books_db_call_duration_seconds", "Database call duration, by operation.",
+    ("operation",))
+
+FETCH_REQUESTS = REGISTRY.counter(
+    "books_fetch_requests_total", "API fetches, by outcome.", ("outcome",))
+FETCH_BYTES = REGISTRY.counter(
+    "books_fetch_bytes_total", "Response bytes received by the API client.")
+FETCH_LATENCY = REGISTRY.histogram(
+    "books_fetch_duration_seconds", "API fetch duration including JSON decoding.")
+
+
+def render_prometheus() -> str:
+    """Render the default registry for the ``/metrics`` route."""
+    return REGISTRY.render_prometheus()
+
+
+def snapshot() -> Dict[str, Dict]:
+    """Return the default registry as a dictionary (for batch runs)."""
+    return REGISTRY.snapshot()
+
+
+def reset():
+    """Zero the default registry."""
+    REGISTRY.reset()
+
+
+class _DbCall:
+    """Mutable holder so the caller can report how many rows it touched."""
+
+    __slots__ = ("rows",)
+
+    def __init__(self):
+        self.rows = 0
+
+
+@contextmanager
+def db_call(operation: str) -> Iterator[_DbCall]:
+    """
+    Time a database call and record its row count.
+
+    Parameters:
+    -----------
+    operation : str
+        Label for the call, e.g. 'store_books'
+
+    Example:
+    --------
+    >>> with db_call("get_all_books") as call:
+    ...     rows = cursor.fetchall()
+    ...     call.rows = len(rows)
+    """
+    call = _DbCall()
+    start = time.perf_counter()
+    try:
+        yield call
+    finally:
+        DB_LATENCY.observe(time.perf_counter() - start, operation=operation)
+        DB_CALLS.inc(operation=operation)
+        DB_ROWS.inc(call.rows, operation=operation)
+
+
+def record_fetch(duration: float, nbytes: int, ok: bool):
+    """Record one ``fetch_books_from_api`` call."""
+    FETCH_LATENCY.observe(duration)
+    FETCH_BYTES.inc(nbytes)
+    FETCH_REQUESTS.inc(outcome="ok" if ok else "error")
+
+
+def record_http_request(route: str, method: str, status: int, duration: float):
+    """Record one handled HTTP request."""
+    HTTP_REQUESTS.inc(route=route, method=method, status=status)
+    HTTP_LATENCY.observe(duration, route=route)
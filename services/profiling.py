@@ -0,0 +1,229 @@
+"""
+Opt-in cProfile sampling for the API and the pipeline stages.
+
+Profiling is off unless enabled with the environment or the CLI:
+
+    BOOKS_PROFILE=1             enable
+    BOOKS_PROFILE_RATE=0.01     fraction of HTTP requests to profile
+    BOOKS_PROFILE_DIR=profiles  where .pstats files go
+
+    python run.py serve --profile --profile-rate 0.05
+
+When enabled, a random ``request_rate`` fraction of Flask requests and
+every run of a decorated stage (``fetch_books_from_api``,
+``store_books``, the CSV importers) is profiled with cProfile. Each
+profile is written as ``<dir>/<route or stage>/<time>-<pid>-<n>.pstats``,
+readable with ``pstats``, snakeviz, tuna or flameprof (flame graphs).
+Overhead is bounded: unsampled requests cost one random draw, a thread
+never runs two profilers at once (nested stages are folded into the
+outer profile), and at most ``max_profiles`` files are written per
+process.
+
+Merged report of every profile of one route:
+    python -m services.profiling profiles/http_GET_books --limit 20
+"""
+
+import argparse
+import cProfile
+import functools
+import itertools
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+ENV_ENABLE = "BOOKS_PROFILE"
+ENV_RATE = "BOOKS_PROFILE_RATE"
+ENV_DIR = "BOOKS_PROFILE_DIR"
+
+DEFAULT_REQUEST_RATE = 0.01
+DEFAULT_OUTPUT_DIR = "profiles"
+
+# Profiles written per process before sampling stops
+DEFAULT_MAX_PROFILES = 1000
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_rate(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class ProfilerConfig:
+    """Current profiling settings (see configure())."""
+
+    def __init__(self):
+        self.enabled = _env_flag(ENV_ENABLE)
+        self.request_rate = _env_rate(ENV_RATE, DEFAULT_REQUEST_RATE)
+        self.output_dir = os.environ.get(ENV_DIR, DEFAULT_OUTPUT_DIR)
+        self.max_profiles = DEFAULT_MAX_PROFILES
+
+
+CONFIG = ProfilerConfig()
+
+_local = threading.local()
+_sequence = itertools.count(1)
+_written = 0
+_written_lock = threading.Lock()
+
+
+def configure(enabled: bool = True, request_rate: Optional[float] = None,
+              output_dir: Optional[str] = None, max_profiles: Optional[int] = None):
+    """
+    Turn profiling on or off at runtime (e.g. from a ``--profile`` flag).
+
+    Parameters:
+    -----------
+    enabled : bool, optional
+        Profile at all (default: True)
+    request_rate : float, optional
+        Fraction of HTTP requests to profile, 0..1 (default: unchanged)
+    output_dir : str, optional
+        Directory for .pstats files (default: unchanged)
+    max_profiles : int, optional
+        Cap on files written by this process (default: unchanged)
+    """
+    CONFIG.enabled = enabled
+    if request_rate is not None:
+        CONFIG.request_rate = request_rate
+    if output_dir is not None:
+        CONFIG.output_dir = output_dir
+    if max_profiles is not None:
+        CONFIG.max_profiles = max_profiles
+
+
+def sample_request() -> bool:
+    """Whether to profile the current request."""
+    return CONFIG.enabled and random.random() < CONFIG.request_rate
+
+
+def _label(name: str) -> str:
+    # 'http GET /books/<int:book_id>' -> 'http_GET_books_int_book_id'
+    return re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_") or "unnamed"
+
+
+def start() -> Optional[cProfile.Profile]:
+    """
+    Start profiling the current thread.
+
+    Returns None (nothing to stop) when the thread is already being
+    profiled, the file cap is reached, or another profiler is active.
+    """
+    if getattr(_local, "active", False) or _written >= CONFIG.max_profiles:
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Python 3.12+: only one cProfile may be active at a time
+        return None
+    _local.active = True
+    return profiler
+
+
+def stop(profiler: Optional[cProfile.Profile], name: str) -> Optional[str]:
+    """
+    Stop a profiler from start() and write it under ``name``.
+
+    Returns:
+    --------
+    str or None
+        Path of the .pstats file written
+    """
+    global _written
+    if profiler is None:
+        return None
+    profiler.disable()
+    _local.active = False
+
+    with _written_lock:
+        if _written >= CONFIG.max_profiles:
+            return None
+        _written += 1
+    directory = os.path.join(CONFIG.output_dir, _label(name))
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-"
+                                   f"{next(_sequence)}.pstats")
+    profiler.dump_stats(path)
+    return path
+
+
+@contextmanager
+def profile_stage(name: str):
+    """Profile the enclosed block as stage ``name`` if profiling is enabled."""
+    profiler = start() if CONFIG.enabled else None
+    try:
+        yield
+    finally:
+        stop(profiler, name)
+
+
+def profiled(name: str = None):
+    """
+    Decorator: profile every call of a pipeline stage when enabled.
+
+    Parameters:
+    -----------
+    name : str, optional
+        Stage name used for the output directory (default: function name)
+    """
+    def decorator(func):
+        stage = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not CONFIG.enabled:
+                return func(*args, **kwargs)
+            with profile_stage(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# =============================================================================
+# REPORT
+# =============================================================================
+
+def load_stats(path: str) -> Optional[pstats.Stats]:
+    """Merge every .pstats file under ``path`` (a file or directory)."""
+    files = [path] if os.path.isfile(path) else sorted(
+        os.path.join(root, f) for root, _, names in os.walk(path)
+        for f in names if f.endswith(".pstats"))
+    if not files:
+        return None
+    stats = pstats.Stats(files[0])
+    for extra in files[1:]:
+        stats.add(extra)
+    return stats
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Merge and print sampled profiles")
+    parser.add_argument("path", nargs="?", default=DEFAULT_OUTPUT_DIR,
+                        help=f"profile file or directory (default: {DEFAULT_OUTPUT_DIR})")
+    parser.add_argument("--sort", default="cumulative",
+                        help="pstats sort key, e.g. cumulative, tottime (default: cumulative)")
+    parser.add_argument("--limit", type=int, default=25,
+                        help="functions to show (default: 25)")
+    args = parser.parse_args(argv)
+
+    stats = load_stats(args.path)
+    if stats is None:
+        print(f"✗ No .pstats files under {args.path}")
+        return 1
+    stats.sort_stats(args.sort).print_stats(args.limit)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
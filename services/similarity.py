@@ -0,0 +1,978 @@
+"""
+Similar-titles search over a local vector index.
+
+Every book is turned into a TF-IDF vector of its character n-grams
+(trigrams by default, of ``title`` and optionally ``author``), L2-normalized
+so cosine similarity is a plain dot product, and stored as one sparse row
+(bucket numbers and float16 weights of the n-grams it contains):
+
+- n-grams are hashed into ``dim`` buckets with a vectorized NumPy rolling
+  hash (no vocabulary to keep, stable across processes);
+- term frequencies are sublinear (1 + log tf) and weighted by smoothed
+  IDF; document frequencies are updated as rows are added, and every time
+  the index has doubled the IDF is refreshed and existing rows re-weighted
+  (a row's new weights are its old ones times new_idf / old_idf);
+- top-K queries score the rows block by block against a batch of dense
+  query vectors. From ``CLUSTER_MIN_ROWS`` rows on, build_clusters() (run
+  by ``sync_sqlite_index()``) adds a coarse k-means index, saved with an
+  on-disk index, and each query only scans the ``nprobe`` closest clusters
+  plus the rows added since; until it exists queries scan every row.
+
+An index lives in memory, or on disk (``path``) as raw arrays that are
+memory-mapped, so a catalog of millions of books is not loaded into RAM.
+On disk, new rows are appended past the committed lengths and re-weighted
+rows go to a new file; meta.json, which names the files and their lengths,
+is replaced last, so a crash leaves the previous index and readers never
+see half-written rows.
+``sync_sqlite_index()`` (``run.py sync --index``) keeps
+``<database>.similar/`` next to a SQLite file up to date by appending the
+rows inserted since the last sync.
+
+Usage:
+    python -m services.similarity books.db --id 7
+    python -m services.similarity books.db --query "the iron gate" -k 5
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import os
+import re
+import sqlite3
+import sys
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services import profiling
+# Index locations (re-exported here; db.database imports them without NumPy)
+from services.index_paths import INDEX_SUFFIX, database_path, index_path, remove_index  # noqa: F401
+
+DEFAULT_DIM = 256
+DEFAULT_NGRAM = 3
+DEFAULT_FIELDS = ("title",)
+DEFAULT_K = 10
+
+# Rows vectorized, re-weighted or scored per block
+BLOCK_ROWS = 65_536
+
+# Use the cluster index from this many rows on, scanning this many clusters
+CLUSTER_MIN_ROWS = 500_000
+DEFAULT_NPROBE = 32
+
+# Refresh the IDF each time the number of rows has grown by this factor
+REFIT_GROWTH = 2.0
+
+_FORMAT = "csr-f16"
+_META_FILE = "meta.json"
+# Files of a new index. Row structure is only ever appended to; weights, df
+# and idf (and the cluster index) are rewritten into new files named after
+# the meta.json generation that commits them (data.3.f16, df.3.npy, ...)
+_INITIAL_FILES = {"indptr": "indptr.i64", "indices": "indices.u16",
+                  "data": "data.f16", "ids": "ids.i64"}
+_GENERATION_FILE = re.compile(r"^(data|df|idf|centroids|order|offsets)\.\d+\.(f16|npy)$")
+_CLUSTER_FILES = ("centroids", "order", "offsets")
+# Fixed names of older indexes; vectors.f32 is the dense float32 layout
+_LEGACY_FILES = ("df.npy", "idf.npy", "vectors.f32")
+
+_HASH_PRIME = np.uint64(1_099_511_628_211)
+_HASH_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+# =============================================================================
+# VECTORIZING
+# =============================================================================
+
+_NON_WORD = re.compile(r"[\W_]+")
+_BATCH_NON_WORD = re.compile(r"[^\w\n]+|_+")
+
+
+def normalize_text(text: str) -> str:
+    """Case-fold, keep letters and digits only, and pad with spaces."""
+    return " " + _NON_WORD.sub(" ", str(text or "").casefold()).strip() + " "
+
+
+def normalize_texts(texts: Sequence[str]) -> List[str]:
+    """normalize_text() of many texts with one regex pass over all of them."""
+    parts = _BATCH_NON_WORD.sub(" ", "\n".join(texts).casefold()).split("\n")
+    if len(parts) != len(texts):
+        # A text contained a line break itself
+        return [normalize_text(t) for t in texts]
+    return [" " + part.strip() + " " for part in parts]
+
+
+def ngram_counts(texts: Sequence[str], ngram: int = DEFAULT_NGRAM,
+                 dim: int = DEFAULT_DIM) -> np.ndarray:
+    """
+    Count hashed character n-grams of already normalized texts.
+
+    All texts are hashed in one pass: they are concatenated, a rolling
+    hash is computed for every window of ``ngram`` characters, and windows
+    that span two texts are dropped.
+
+    Returns:
+    --------
+    np.ndarray
+        float32 array of shape (len(texts), dim)
+    """
+    counts = np.zeros((len(texts), dim), dtype=np.float32)
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    total = int(lengths.sum())
+    if total < ngram:
+        return counts
+
+    codes = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    windows = total - ngram + 1
+    hashes = np.zeros(windows, dtype=np.uint64)
+    for j in range(ngram):
+        hashes = hashes * _HASH_PRIME + codes[j:j + windows]
+    hashes ^= hashes >> np.uint64(29)
+    hashes *= _HASH_MIX
+    hashes ^= hashes >> np.uint64(32)
+
+    doc = np.repeat(np.arange(len(texts)), lengths)
+    inside = doc[:windows] == doc[ngram - 1:]
+    flat = doc[:windows][inside] * dim + (hashes[inside] % np.uint64(dim)).astype(np.int64)
+    counts.ravel()[:] = np.bincount(flat, minlength=counts.size)
+    return counts
+
+
+def _idf(df: np.ndarray, documents: int) -> np.ndarray:
+    # Smoothed IDF: n-grams seen in every document still weigh 1
+    return (np.log((1.0 + documents) / (1.0 + df)) + 1.0).astype(np.float32)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+# =============================================================================
+# INDEX
+# =============================================================================
+
+class SimilarityIndex:
+    """
+    TF-IDF vectors of books, searchable by cosine similarity.
+
+    Rows are stored sparse (CSR): per book only the buckets its n-grams
+    hit, as uint16 bucket numbers and float16 weights, about 4 bytes per
+    distinct n-gram (~80 bytes for a typical title).
+
+    Parameters:
+    -----------
+    dim : int, optional
+        Hash buckets per vector, at most 65536 (default: DEFAULT_DIM)
+    ngram : int, optional
+        Character n-gram length (default: DEFAULT_NGRAM)
+    fields : tuple, optional
+        Book fields whose text is vectorized, e.g. ('title', 'author')
+        (default: ('title',))
+    path : str, optional
+        Directory to keep the index in; rows are appended to memory-mapped
+        files there (default: None = in memory only)
+
+    Example:
+    --------
+    >>> index = SimilarityIndex(fields=("title", "author"))
+    >>> index.add(books)
+    >>> index.similar(7, k=5)
+    [(42, 0.91), (3, 0.77), ...]
+    """
+
+    def __init__(self, dim: int = DEFAULT_DIM, ngram: int = DEFAULT_NGRAM,
+                 fields: Sequence[str] = DEFAULT_FIELDS, path: Optional[str] = None):
+        if not 1 <= dim <= 65536:
+            raise ValueError("dim must be between 1 and 65536")
+        self.dim = dim
+        self.ngram = ngram
+        self.fields = tuple(fields)
+        self.path = path
+        self.writable = True
+        self._lock = threading.RLock()
+        # Number of the last meta.json written, and the files it names
+        self._generation = 0
+        self._committed = {}
+        self._clear()
+
+    def _clear(self):
+        self.size = 0
+        self.nnz = 0
+        self.max_id = 0
+        self.df = np.zeros(self.dim, dtype=np.int64)
+        self.idf = None
+        self.fitted_rows = 0
+        # Fingerprint of the SQLite table the rows came from (database_fingerprint())
+        self.database = None
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.zeros(0, dtype=np.uint16)
+        self._data = np.zeros(0, dtype=np.float16)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._ids_sorted = True
+        self._order = None
+        self._clusters = None
+        self._files = dict(_INITIAL_FILES)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __repr__(self):
+        where = self.path or "memory"
+        return f"SimilarityIndex({self.size} rows, fields={self.fields}, {where})"
+
+    @property
+    def ids(self) -> np.ndarray:
+        """Book IDs in row order."""
+        return self._ids[:self.size]
+
+    def set_database(self, fingerprint: Optional[Dict]):
+        """Record which database the rows came from (saved with the index)."""
+        with self._lock:
+            self.database = fingerprint
+            if self.path and self.writable:
+                os.makedirs(self.path, exist_ok=True)
+                self._write_meta()
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes taken by the stored rows and IDs."""
+        return 8 * (self.size + 1) + 4 * self.nnz + 8 * self.size
+
+    def reset(self):
+        """Drop every row (and the files of an on-disk index)."""
+        if not self.writable:
+            raise ValueError("Index was opened read-only")
+        with self._lock:
+            self._clear()
+            if self.path:
+                os.makedirs(self.path, exist_ok=True)
+                for name in _INITIAL_FILES.values():
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(os.path.join(self.path, name))
+                self._write_meta()
+
+    # -- persistence -----------------------------------------------------------
+
+    @classmethod
+    def open(cls, path: str, writable: bool = True, **options) -> "SimilarityIndex":
+        """
+        Open the index stored in ``path``, or start an empty one there.
+
+        An index written in an older layout is started over.
+
+        Parameters:
+        -----------
+        path : str
+            Index directory
+        writable : bool, optional
+            Map the files read-write so rows can be added (default: True)
+        **options
+            dim / ngram / fields for a new index
+        """
+        meta = _read_meta(path)
+        if meta is None or meta.get("format") != _FORMAT:
+            if not writable:
+                raise FileNotFoundError(f"No similarity index in {path}")
+            index = cls(path=path, **options)
+            if meta is not None:
+                index.reset()
+            return index
+
+        while True:
+            try:
+                return cls._load(path, meta, writable)
+            except FileNotFoundError:
+                # A writer committed new files (and removed the ones this
+                # meta.json named) between reading it and opening them
+                latest = _read_meta(path)
+                if latest is None or latest == meta:
+                    raise
+                meta = latest
+
+    @classmethod
+    def _load(cls, path: str, meta: Dict, writable: bool) -> "SimilarityIndex":
+        index = cls(dim=meta["dim"], ngram=meta["ngram"], fields=meta["fields"], path=path)
+        index.writable = writable
+        index.size = meta["rows"]
+        index.nnz = meta["nnz"]
+        index.max_id = meta["max_id"]
+        index.fitted_rows = meta["fitted_rows"]
+        index._ids_sorted = meta["ids_sorted"]
+        index.database = meta.get("database")
+        index._generation = meta.get("generation", 0)
+        # Indexes written before generations used fixed file names
+        files = meta.get("files") or dict(_INITIAL_FILES, df="df.npy", idf="idf.npy")
+        index._files = dict(files)
+        index._committed = dict(files)
+        index.df = np.load(os.path.join(path, files["df"]))
+        if index.fitted_rows:
+            index.idf = np.load(os.path.join(path, files["idf"]))
+        index._map_files()
+        if meta.get("clusters"):
+            centroids, order, offsets = (
+                np.load(os.path.join(path, files[key]), mmap_mode="r" if key == "order" else None)
+                for key in _CLUSTER_FILES)
+            index._clusters = (centroids, order, offsets, meta["clusters"]["covered"])
+        return index
+
+    def _map_files(self):
+        mode = "r+" if self.writable else "r"
+        arrays = {}
+        for key, dtype, length in (("indptr", np.int64, self.size + 1),
+                                   ("indices", np.uint16, self.nnz),
+                                   ("data", np.float16, self.nnz),
+                                   ("ids", np.int64, self.size)):
+            # np.memmap cannot map zero bytes
+            arrays[key] = (np.memmap(os.path.join(self.path, self._files[key]), dtype=dtype,
+                                     mode=mode, shape=(length,)) if length
+                           else np.zeros(0, dtype=dtype))
+        self._indptr = arrays["indptr"] if self.size else np.zeros(1, dtype=np.int64)
+        self._indices = arrays["indices"]
+        self._data = arrays["data"]
+        self._ids = arrays["ids"]
+
+    def _append_files(self, ids, indptr, indices, data):
+        os.makedirs(self.path, exist_ok=True)
+        if self.size == 0:
+            # The row pointer file starts with the offset of row 0
+            indptr = np.concatenate([[0], indptr])
+        for key, values, keep in (("indptr", indptr, 8 * (self.size + 1) if self.size else 0),
+                                  ("indices", indices, 2 * self.nnz),
+                                  ("data", data, 2 * self.nnz),
+                                  ("ids", ids, 8 * self.size)):
+            file_path = os.path.join(self.path, self._files[key])
+            with open(file_path, "ab" if os.path.exists(file_path) else "wb") as f:
+                # Drop bytes of an append that never made it into meta.json;
+                # readers only map the part meta.json covers
+                f.truncate(keep)
+                f.write(np.ascontiguousarray(values).tobytes())
+
+    def _write_meta(self):
+        """
+        Commit the current state: write df / idf to files of the next
+        generation, then atomically replace meta.json, which names every
+        file of the index. Files it no longer names are removed afterwards.
+
+        Nothing meta.json names is modified before it is replaced (appends
+        go past the lengths it records, re-weighted rows to a new data
+        file), so a crash at any point leaves the previous index intact and
+        readers that mapped it keep consistent rows.
+        """
+        generation = self._generation + 1
+        files = dict(self._files)
+        files["df"] = f"df.{generation}.npy"
+        np.save(os.path.join(self.path, files["df"]), self.df)
+        files.pop("idf", None)
+        if self.idf is not None:
+            files["idf"] = f"idf.{generation}.npy"
+            np.save(os.path.join(self.path, files["idf"]), self.idf)
+        meta = {"format": _FORMAT, "dim": self.dim, "ngram": self.ngram,
+                "fields": list(self.fields), "rows": self.size, "nnz": self.nnz,
+                "max_id": self.max_id, "fitted_rows": self.fitted_rows,
+                "ids_sorted": self._ids_sorted, "database": self.database,
+                "clusters": {"covered": self._clusters[3]} if self._clusters else None,
+                "generation": generation, "files": files}
+        tmp_path = os.path.join(self.path, _META_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(self.path, _META_FILE))
+        self._generation = generation
+        self._files = files
+        self._committed = dict(files)
+        self._remove_stale_files()
+
+    def _remove_stale_files(self):
+        """Delete rewritten files that meta.json no longer names."""
+        named = set(self._files.values())
+        for name in os.listdir(self.path):
+            if name in named:
+                continue
+            if (_GENERATION_FILE.match(name) or name in _LEGACY_FILES
+                    or name in _INITIAL_FILES.values()):
+                # Readers that still map the file keep their copy (POSIX)
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(os.path.join(self.path, name))
+
+    # -- adding rows -----------------------------------------------------------
+
+    def _raw_text(self, book: Dict) -> str:
+        if len(self.fields) == 1:
+            return str(book.get(self.fields[0]) or "")
+        return " ".join(str(book.get(f) or "") for f in self.fields)
+
+    def text_of(self, book: Dict) -> str:
+        """Normalized text of the indexed fields of a book."""
+        return normalize_text(self._raw_text(book))
+
+    def _counts(self, books: Sequence[Dict]) -> np.ndarray:
+        texts = normalize_texts([self._raw_text(b) for b in books])
+        return ngram_counts(texts, self.ngram, self.dim)
+
+    def vectorize(self, books: Iterable[Dict]) -> np.ndarray:
+        """Dense TF-IDF vectors of books that are not (necessarily) in the index."""
+        return self._tfidf(self._counts(list(books)))
+
+    def vectorize_text(self, text: str) -> np.ndarray:
+        """Dense TF-IDF vector of free text, e.g. a search query."""
+        return self._tfidf(ngram_counts([normalize_text(text)], self.ngram, self.dim))[0]
+
+    def _tfidf(self, counts: np.ndarray) -> np.ndarray:
+        present = counts > 0
+        counts[present] = 1.0 + np.log(counts[present])
+        idf = self.idf if self.idf is not None else np.ones(self.dim, dtype=np.float32)
+        return _normalize_rows(counts * idf)
+
+    def add(self, books: Iterable[Dict]) -> int:
+        """
+        Vectorize and append books (dicts with ``id`` and the indexed fields).
+
+        Returns:
+        --------
+        int
+            Number of rows added
+        """
+        if not self.writable:
+            raise ValueError("Index was opened read-only")
+        books = list(books)
+        with self._lock:
+            for start in range(0, len(books), BLOCK_ROWS):
+                batch = books[start:start + BLOCK_ROWS]
+                ids = np.fromiter((b["id"] for b in batch), dtype=np.int64, count=len(batch))
+                counts = self._counts(batch)
+                self.df += (counts > 0).sum(axis=0)
+                if self.idf is None or self.size + len(batch) >= REFIT_GROWTH * self.fitted_rows:
+                    self._refit(self.size + len(batch))
+                self._append(ids, self._tfidf(counts))
+            if self.path and books:
+                self._write_meta()
+        return len(books)
+
+    def _append(self, ids: np.ndarray, vectors: np.ndarray):
+        if self._ids_sorted and len(ids):
+            self._ids_sorted = (ids[0] > self.max_id or self.size == 0) and \
+                bool(np.all(ids[1:] > ids[:-1]))
+        rows, cols = np.nonzero(vectors)
+        indices = cols.astype(np.uint16)
+        data = vectors[rows, cols].astype(np.float16)
+        indptr = self.nnz + np.cumsum(np.bincount(rows, minlength=len(ids)))
+
+        if self.path:
+            self._append_files(ids, indptr, indices, data)
+            self.size += len(ids)
+            self.nnz += len(data)
+            self._map_files()
+        else:
+            self._indptr = _extend(self._indptr, self.size + 1, indptr)
+            self._indices = _extend(self._indices, self.nnz, indices)
+            self._data = _extend(self._data, self.nnz, data)
+            self._ids = _extend(self._ids, self.size, ids)
+            self.size += len(ids)
+            self.nnz += len(data)
+        if len(ids):
+            self.max_id = max(self.max_id, int(ids.max()))
+        self._order = None
+
+    def _refit(self, documents: int):
+        """Recompute the IDF for ``documents`` rows and re-weight existing rows."""
+        new_idf = _idf(self.df, documents)
+        if self.idf is not None and self.size:
+            ratio = new_idf / self.idf
+            out = self._data
+            if self.path and self.nnz and self._files["data"] == self._committed.get("data"):
+                # Re-weight into a new file: the committed one stays as
+                # meta.json describes it until _write_meta() swaps them
+                name = f"data.{self._generation + 1}.f16"
+                out = np.memmap(os.path.join(self.path, name), dtype=np.float16, mode="w+",
+                                shape=(self.nnz,))
+                self._files["data"] = name
+            for start in range(0, self.size, BLOCK_ROWS):
+                stop = min(start + BLOCK_ROWS, self.size)
+                lo, hi = int(self._indptr[start]), int(self._indptr[stop])
+                weights = self._data[lo:hi].astype(np.float32) * ratio[self._indices[lo:hi]]
+                bounds = np.asarray(self._indptr[start:stop + 1]) - lo
+                norms = np.sqrt(_segment_sums(weights[None, :] ** 2, bounds)[0])
+                norms = np.repeat(norms, np.diff(bounds))
+                np.divide(weights, norms, out=weights, where=norms > 0)
+                out[lo:hi] = weights
+            if isinstance(out, np.memmap):
+                out.flush()
+            self._data = out
+            # Re-weighted rows may sit in different clusters
+            self._drop_clusters()
+        self.idf = new_idf
+        self.fitted_rows = documents
+
+    # -- reading rows ----------------------------------------------------------
+
+    def _nonzeros(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """For the stored entries of ``rows``: owning position in ``rows``, offset."""
+        starts = np.asarray(self._indptr[rows])
+        lengths = np.asarray(self._indptr[rows + 1]) - starts
+        owner = np.repeat(np.arange(len(rows)), lengths)
+        offsets = np.arange(int(lengths.sum())) + np.repeat(starts - (np.cumsum(lengths) -
+                                                                    lengths), lengths)
+        return owner, offsets
+
+    def dense(self, rows: np.ndarray) -> np.ndarray:
+        """Rows as a dense float32 array, shape (len(rows), dim)."""
+        rows = np.asarray(rows, dtype=np.int64)
+        out = np.zeros((len(rows), self.dim), dtype=np.float32)
+        owner, offsets = self._nonzeros(rows)
+        out[owner, self._indices[offsets]] = self._data[offsets]
+        return out
+
+    def _score_range(self, queries: np.ndarray, start: int, stop: int) -> np.ndarray:
+        """Dot products of queries (m, dim) with rows start..stop, shape (m, rows)."""
+        lo, hi = int(self._indptr[start]), int(self._indptr[stop])
+        products = queries[:, self._indices[lo:hi]] * self._data[lo:hi]
+        return _segment_sums(products, np.asarray(self._indptr[start:stop + 1]) - lo)
+
+    def _score_rows(self, query: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        owner, offsets = self._nonzeros(rows)
+        products = query[self._indices[offsets]] * self._data[offsets]
+        return np.bincount(owner, weights=products, minlength=len(rows)).astype(np.float32)
+
+    # -- search ----------------------------------------------------------------
+
+    def row_of(self, book_id: int) -> Optional[int]:
+        """Row holding ``book_id``, or None if it is not indexed."""
+        ids = self.ids
+        if self._ids_sorted:
+            row = int(np.searchsorted(ids, book_id))
+        else:
+            if self._order is None:
+                self._order = np.argsort(ids, kind="stable")
+            pos = int(np.searchsorted(ids, book_id, sorter=self._order))
+            row = int(self._order[pos]) if pos < len(ids) else len(ids)
+        return row if row < len(ids) and ids[row] == book_id else None
+
+    def search(self, queries: np.ndarray, k: int = DEFAULT_K,
+               exclude: Optional[Sequence[Optional[int]]] = None,
+               nprobe: int = DEFAULT_NPROBE, exact: Optional[bool] = None
+               ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-``k`` rows for a batch of query vectors.
+
+        Parameters:
+        -----------
+        queries : np.ndarray
+            Normalized dense vectors, shape (m, dim) or (dim,)
+        k : int, optional
+            Neighbors per query (default: DEFAULT_K)
+        exclude : sequence, optional
+            Per query, a row to leave out (e.g. the query book's own row)
+        nprobe : int, optional
+            Clusters scanned per query when the cluster index is used
+        exact : bool, optional
+            Force (True) or forbid (False) a full scan; by default the
+            cluster index is used from CLUSTER_MIN_ROWS rows on. Without
+            one (see build_clusters()) every search is a full scan
+
+        Returns:
+        --------
+        (rows, scores)
+            Arrays of shape (m, k) sorted by descending score; missing
+            neighbors have row -1 and score -inf
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        exclude = list(exclude) if exclude is not None else [None] * len(queries)
+        size = self.size
+        if exact is None:
+            exact = size < CLUSTER_MIN_ROWS
+        # Clusters are built by syncs, never on the query path
+        if exact or self._clusters is None:
+            return self._search_exact(queries, k, exclude, size)
+        return self._search_clusters(queries, k, exclude, nprobe, size)
+
+    def _search_exact(self, queries, k, exclude, size):
+        m = len(queries)
+        best_rows = np.full((m, 0), -1, dtype=np.int64)
+        best_scores = np.full((m, 0), -np.inf, dtype=np.float32)
+        # Bound the (queries x stored entries) product array of one block
+        block = max(1024, BLOCK_ROWS // m)
+        for start in range(0, size, block):
+            stop = min(start + block, size)
+            # One pass over the block scores it for every query
+            scores = self._score_range(queries, start, stop)
+            for q, row in enumerate(exclude):
+                if row is not None and start <= row < stop:
+                    scores[q, row - start] = -np.inf
+            top = min(k, stop - start)
+            cand = np.argpartition(-scores, top - 1, axis=1)[:, :top]
+            best_rows = np.hstack([best_rows, cand + start])
+            best_scores = np.hstack([best_scores, np.take_along_axis(scores, cand, axis=1)])
+            if best_rows.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+        return self._finish(best_rows, best_scores, k)
+
+    def _search_clusters(self, queries, k, exclude, nprobe, size):
+        centroids, order, offsets, covered = self._clusters
+        nprobe = min(nprobe, len(centroids))
+        probes = np.argpartition(-(queries @ centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+        tail = np.arange(covered, size)
+        rows_out = np.full((len(queries), k), -1, dtype=np.int64)
+        scores_out = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        for q, query in enumerate(queries):
+            parts = [order[offsets[c]:offsets[c + 1]] for c in probes[q]] + [tail]
+            # Sorted rows read memory-mapped files front to back
+            rows = np.sort(np.concatenate(parts))
+            if exclude[q] is not None:
+                rows = rows[rows != exclude[q]]
+            if not len(rows):
+                continue
+            scores = self._score_rows(query, rows)
+            top = min(k, len(rows))
+            cand = np.argpartition(-scores, top - 1)[:top]
+            rows_out[q, :top] = rows[cand]
+            scores_out[q, :top] = scores[cand]
+        return self._finish(rows_out, scores_out, k)
+
+    @staticmethod
+    def _finish(rows, scores, k):
+        order = np.argsort(-scores, axis=1, kind="stable")
+        rows = np.take_along_axis(rows, order, axis=1)
+        scores = np.take_along_axis(scores, order, axis=1)
+        if rows.shape[1] < k:
+            pad = k - rows.shape[1]
+            rows = np.pad(rows, ((0, 0), (0, pad)), constant_values=-1)
+            scores = np.pad(scores, ((0, 0), (0, pad)), constant_values=-np.inf)
+        return rows, scores
+
+    def _results(self, rows: np.ndarray, scores: np.ndarray) -> List[Tuple[int, float]]:
+        ids = self.ids
+        # float16 weights can put a perfect match a hair above 1
+        return [(int(ids[r]), min(float(s), 1.0)) for r, s in zip(rows, scores) if r >= 0]
+
+    def similar(self, book_id: int, k: int = DEFAULT_K,
+                book: Optional[Dict] = None, **search_options) -> List[Tuple[int, float]]:
+        """
+        Books most similar to an indexed book, best first.
+
+        Parameters:
+        -----------
+        book_id : int
+            ID of the book to find neighbors of
+        k : int, optional
+            Number of neighbors (default: DEFAULT_K)
+        book : Dict, optional
+            The book itself, vectorized when ``book_id`` is not indexed yet
+
+        Returns:
+        --------
+        List[Tuple[int, float]]
+            (book ID, cosine similarity) pairs; empty if the book is unknown
+        """
+        row = self.row_of(book_id) if self.size else None
+        if row is not None:
+            query = self.dense([row])[0]
+        elif book is not None:
+            query = self.vectorize([book])[0]
+        else:
+            return []
+        rows, scores = self.search(query, k, exclude=[row], **search_options)
+        return [(i, s) for i, s in self._results(rows[0], scores[0]) if i != book_id]
+
+    def search_text(self, text: str, k: int = DEFAULT_K,
+                    **search_options) -> List[Tuple[int, float]]:
+        """Books whose indexed text is most similar to ``text``, best first."""
+        rows, scores = self.search(self.vectorize_text(text), k, **search_options)
+        return self._results(rows[0], scores[0])
+
+    # -- cluster index ---------------------------------------------------------
+
+    def build_clusters(self, clusters: Optional[int] = None, iterations: int = 8,
+                       min_rows: int = CLUSTER_MIN_ROWS, seed: int = 0) -> bool:
+        """
+        Build (or refresh) the coarse k-means index used by large searches.
+
+        Spherical k-means runs on a sample of rows, then every row is
+        assigned to its closest centroid. Rows added later are scanned in
+        full until they make up a fifth of the index, then it is rebuilt;
+        an IDF refit drops it. A writable on-disk index saves the clusters
+        with its other files, so readers load them instead of building
+        them. This takes seconds on millions of rows: call it when the
+        index is updated (sync_sqlite_index() does), not per query.
+
+        Parameters:
+        -----------
+        clusters : int, optional
+            Number of clusters (default: sqrt of the row count)
+        iterations : int, optional
+            k-means iterations (default: 8)
+        min_rows : int, optional
+            Do nothing below this many rows (default: CLUSTER_MIN_ROWS)
+
+        Returns:
+        --------
+        bool
+            True if a cluster index is available afterwards
+        """
+        with self._lock:
+            size = self.size
+            if size < max(min_rows, 2):
+                return False
+            if self._clusters is not None and size - self._clusters[3] <= size // 5:
+                return True
+
+            clusters = min(clusters or int(math.sqrt(size)), size)
+            rng = np.random.default_rng(seed)
+            sample_size = min(size, max(50 * clusters, 10_000), 200_000)
+            sample = self.dense(np.sort(rng.choice(size, sample_size, replace=False)))
+            centroids = sample[rng.choice(sample_size, clusters, replace=False)].copy()
+            for _ in range(iterations):
+                assign = self._assign(sample, centroids)
+                order = np.argsort(assign, kind="stable")
+                counts = np.bincount(assign, minlength=clusters)
+                filled = counts > 0
+                starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[filled]
+                # Empty clusters keep their old centroid
+                centroids[filled] = np.add.reduceat(sample[order], starts, axis=0)
+                _normalize_rows(centroids)
+
+            step = 8192
+            assign = np.concatenate([self._assign(self.dense(np.arange(s, min(s + step, size))),
+                                                  centroids)
+                                     for s in range(0, size, step)])
+            order = np.argsort(assign, kind="stable")
+            offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=clusters))])
+            self._clusters = (centroids, order, offsets, size)
+            if self.path and self.writable:
+                self._save_clusters()
+            return True
+
+    def _save_clusters(self):
+        generation = self._generation + 1
+        for key, values in zip(_CLUSTER_FILES, self._clusters[:3]):
+            self._files[key] = f"{key}.{generation}.npy"
+            np.save(os.path.join(self.path, self._files[key]), values)
+        self._write_meta()
+
+    def _drop_clusters(self):
+        self._clusters = None
+        for key in _CLUSTER_FILES:
+            self._files.pop(key, None)
+
+    @staticmethod
+    def _assign(rows: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        out = np.empty(len(rows), dtype=np.int64)
+        step = max(1, 2 ** 24 // len(centroids))
+        for start in range(0, len(rows), step):
+            out[start:start + step] = np.argmax(rows[start:start + step] @ centroids.T, axis=1)
+        return out
+
+
+def _extend(array: np.ndarray, used: int, values: np.ndarray) -> np.ndarray:
+    """Write ``values`` after the first ``used`` items, growing geometrically."""
+    needed = used + len(values)
+    if needed > len(array):
+        # Doubling keeps repeated small adds amortized O(1)
+        grown = np.zeros(max(needed, 2 * len(array), 1024), dtype=array.dtype)
+        grown[:used] = array[:used]
+        array = grown
+    array[used:needed] = values
+    return array
+
+
+def _segment_sums(values: np.ndarray, bounds: np.ndarray) -> np.ndarray:
+    """Sums of values[:, bounds[i]:bounds[i + 1]] for every i, shape (m, len(bounds) - 1)."""
+    totals = np.zeros((values.shape[0], values.shape[1] + 1), dtype=np.float64)
+    np.cumsum(values, axis=1, out=totals[:, 1:])
+    return (totals[:, bounds[1:]] - totals[:, bounds[:-1]]).astype(np.float32)
+
+
+def _read_meta(path: str) -> Optional[Dict]:
+    try:
+        with open(os.path.join(path, _META_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+# =============================================================================
+# SQLITE
+# =============================================================================
+
+def index_version(path: str) -> Optional[int]:
+    """Modification stamp of the index stored in ``path``, None if there is none."""
+    try:
+        return os.stat(os.path.join(path, _META_FILE)).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _database_inode(conn: sqlite3.Connection) -> Optional[int]:
+    db_path = database_path(conn)
+    return os.stat(db_path).st_ino if db_path else None
+
+
+def database_fingerprint(conn: sqlite3.Connection, table: str = "books",
+                         up_to_id: Optional[int] = None) -> Dict:
+    """
+    Identify the rows of ``table`` an index was built from.
+
+    The database file's inode plus the count and ID range of the rows with
+    an ID up to ``up_to_id`` (all rows by default). A database that was
+    deleted and recreated, or lost rows, no longer gives the same values.
+    Counting reads every row, so this is for syncs and index (re)opens;
+    quick_matches_database() is the per-request check.
+    """
+    where, params = ("WHERE id <= ?", (up_to_id,)) if up_to_id is not None else ("", ())
+    rows, low, high = conn.execute(
+        f'SELECT COUNT(*), MIN(id), MAX(id) FROM "{table}" {where}', params).fetchone()
+    return {"inode": _database_inode(conn), "rows": rows, "min_id": low, "max_id": high}
+
+
+def matches_database(index: SimilarityIndex, conn: sqlite3.Connection,
+                     table: str = "books") -> bool:
+    """Whether the rows of ``index`` are still the rows of ``table`` up to its max ID."""
+    if not len(index):
+        return True
+    return index.database == database_fingerprint(conn, table, index.max_id)
+
+
+def quick_matches_database(index: SimilarityIndex, conn: sqlite3.Connection,
+                           table: str = "books") -> bool:
+    """
+    Cheap version of matches_database() for an index that matched before.
+
+    Checks the database file's inode, the table's lowest ID and that its
+    highest ID has not dropped below the index's: two rowid lookups
+    instead of a count. That catches a recreated or cleared table; a row
+    deleted from the middle goes unnoticed, and only means a result whose
+    book is gone, which callers drop when they fetch the books.
+    """
+    if not len(index):
+        return True
+    fingerprint = index.database
+    if fingerprint is None:
+        return False
+    low, high = conn.execute(f'SELECT (SELECT MIN(id) FROM "{table}"), '
+                             f'(SELECT MAX(id) FROM "{table}")').fetchone()
+    return (_database_inode(conn) == fingerprint["inode"] and low == fingerprint["min_id"]
+            and high is not None and high >= index.max_id)
+
+
+def add_sqlite_rows(index: SimilarityIndex, conn: sqlite3.Connection, table: str = "books",
+                    batch_size: int = BLOCK_ROWS, verify: bool = True) -> int:
+    """
+    Add the rows of ``table`` with an ID above ``index.max_id`` to the index.
+
+    If the index does not match the table any more (see matches_database()),
+    it is emptied first and rebuilt from every row. ``verify=False`` skips
+    that check, which counts the indexed rows, for callers that have just
+    made it (e.g. with quick_matches_database()).
+
+    Returns:
+    --------
+    int
+        Number of rows added
+    """
+    if verify and not matches_database(index, conn, table):
+        index.reset()
+    fingerprint = index.database if len(index) else \
+        {"inode": _database_inode(conn), "rows": 0, "min_id": None, "max_id": None}
+    cursor = conn.execute(f'SELECT id, title, author FROM "{table}" WHERE id > ? ORDER BY id',
+                          (index.max_id,))
+    added, first_id = 0, None
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        if first_id is None:
+            first_id = rows[0][0]
+        added += index.add({"id": r[0], "title": r[1], "author": r[2]} for r in rows)
+
+    if fingerprint is None:
+        # Index written before fingerprints were stored
+        fingerprint = database_fingerprint(conn, table, index.max_id)
+    elif added:
+        # Every row up to the new max ID is now an old row or one just read
+        fingerprint = dict(fingerprint, rows=fingerprint["rows"] + added,
+                           min_id=first_id if fingerprint["min_id"] is None
+                           else fingerprint["min_id"],
+                           max_id=index.max_id)
+    if fingerprint != index.database:
+        index.set_database(fingerprint)
+    return added
+
+
+@profiling.profiled()
+def sync_sqlite_index(conn: sqlite3.Connection, path: Optional[str] = None,
+                      table: str = "books", **options) -> Optional[SimilarityIndex]:
+    """
+    Bring the on-disk index of a database up to date with its table.
+
+    Only rows inserted since the last sync are vectorized (IDs grow
+    monotonically with AUTOINCREMENT), so calling this after every insert
+    batch keeps the index current at the cost of the new rows only. An
+    index left over from a deleted or rebuilt database is rebuilt. From
+    CLUSTER_MIN_ROWS rows on, the cluster index is (re)built and saved
+    here too, so searches never have to build it.
+
+    Parameters:
+    -----------
+    conn : sqlite3.Connection
+        Connection to the database
+    path : str, optional
+        Index directory (default: <database file>.similar)
+    table : str, optional
+        Table with id, title and author columns (default: 'books')
+    **options
+        dim / ngram / fields when the index is created
+
+    Returns:
+    --------
+    SimilarityIndex or None
+        The index, or None for an in-memory database without ``path``
+    """
+    if path is None:
+        db_path = database_path(conn)
+        if db_path is None:
+            return None
+        path = index_path(db_path)
+    index = SimilarityIndex.open(path, **options)
+    add_sqlite_rows(index, conn, table)
+    index.build_clusters()
+    return index
+
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Find books with similar titles")
+    parser.add_argument("database", help="SQLite database written by store_books()")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--id", type=int, help="book to find neighbors of")
+    group.add_argument("--query", help="free text to search for")
+    parser.add_argument("-k", type=int, default=DEFAULT_K,
+                        help=f"results to show (default: {DEFAULT_K})")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.database)
+    try:
+        index = sync_sqlite_index(conn)
+        results = (index.similar(args.id, args.k) if args.id is not None
+                   else index.search_text(args.query, args.k))
+        if not results:
+            print("✗ No matching books")
+            return 1
+        titles = dict(conn.execute(
+            f"SELECT id, title FROM books WHERE id IN ({','.join('?' * len(results))})",
+            [i for i, _ in results]).fetchall())
+    finally:
+        conn.close()
+
+    for book_id, score in results:
+        print(f"{score:6.3f}  {book_id:<8} {titles.get(book_id, '?')}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,28 @@
+"""
+Shared fixtures. The tests import the repo's packages and scripts from
+the repository root, so it is put on sys.path however pytest is started.
+"""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def load_script(filename: str, name: str):
+    """Import a top-level script whose file name is not a module name."""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    """An empty HTTP cache directory for CachedHTTPSource."""
+    return str(tmp_path / "cache")
@@ -0,0 +1,188 @@
+"""
+Tests for analysis.sources: the HTTP cache rules and MultiSource timeouts.
+
+No test touches the network: requests.get is replaced by a fake that
+records the URLs it is asked for.
+"""
+
+import json
+import os
+import time
+
+import pytest
+import requests
+
+from analysis.sources import CachedHTTPSource, DataSourceError, MultiSource
+
+URL = "https://example.test/products"
+CACHED = [{"title": "cached", "price": 1.0, "category": "x"}]
+FETCHED = [{"title": "fetched", "price": 2.0, "category": "y"}]
+
+
+class FakeResponse:
+    def __init__(self, records):
+        self.content = json.dumps(records).encode()
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class FakeGet:
+    """Stand-in for requests.get that records the URLs it was asked for."""
+
+    def __init__(self):
+        self.urls = []
+        # FakeResponse to return, or an exception to raise
+        self.response = FakeResponse(FETCHED)
+
+    def __call__(self, url, timeout=None):
+        self.urls.append(url)
+        if isinstance(self.response, Exception):
+            raise self.response
+        return self.response
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    fake = FakeGet()
+    monkeypatch.setattr(requests, "get", fake)
+    return fake
+
+
+def write_cache(source, records, age=0.0):
+    """Store ``records`` as the cached response, written ``age`` seconds ago."""
+    source._write_cache(json.dumps(records).encode())
+    if age:
+        then = time.time() - age
+        os.utime(source.cache_path, (then, then))
+
+
+# =============================================================================
+# CachedHTTPSource
+# =============================================================================
+
+def test_fresh_cache_is_used_without_fetching(cache_dir, fetches):
+    source = CachedHTTPSource(URL, cache_dir=cache_dir, ttl=3600)
+    write_cache(source, CACHED, age=60)
+
+    assert source.load() == CACHED
+    assert fetches.urls == []
+
+
+def test_missing_cache_is_fetched_and_written(cache_dir, fetches):
+    source = CachedHTTPSource(URL, cache_dir=cache_dir)
+
+    assert source.load() == FETCHED
+    assert fetches.urls == [URL]
+    assert CachedHTTPSource(URL, cache_dir=cache_dir, offline=True).load() == FETCHED
+
+
+def test_stale_cache_is_refreshed(cache_dir, fetches):
+    source = CachedHTTPSource(URL, cache_dir=cache_dir, ttl=3600)
+    write_cache(source, CACHED, age=7200)
+
+    assert source.load() == FETCHED
+    assert fetches.urls == [URL]
+    assert source.cache_age() < 3600
+
+
+def test_stale_cache_is_used_when_fetch_fails(cache_dir, fetches, capsys):
+    source = CachedHTTPSource(URL, cache_dir=cache_dir, ttl=3600)
+    write_cache(source, CACHED, age=7200)
+    fetches.response = requests.ConnectionError("network down")
+
+    assert source.load() == CACHED
+    assert fetches.urls == [URL]
+    assert "using cached copy from 2.0h ago" in capsys.readouterr().out
+
+
+def test_failed_fetch_without_cache_raises(cache_dir, fetches):
+    fetches.response = requests.ConnectionError("network down")
+
+    with pytest.raises(DataSourceError, match="network down"):
+        CachedHTTPSource(URL, cache_dir=cache_dir).load()
+
+
+def test_offline_uses_stale_cache(cache_dir, fetches):
+    source = CachedHTTPSource(URL, cache_dir=cache_dir, ttl=3600, offline=True)
+    write_cache(source, CACHED, age=30 * 24 * 3600)
+
+    assert source.load() == CACHED
+    assert fetches.urls == []
+
+
+def test_offline_without_cache_raises(cache_dir, fetches):
+    with pytest.raises(DataSourceError, match="Offline"):
+        CachedHTTPSource(URL, cache_dir=cache_dir, offline=True).load()
+    assert fetches.urls == []
+
+
+# =============================================================================
+# MultiSource
+# =============================================================================
+
+class SleepySource:
+    """Returns one record after ``seconds``, or raises ``error``."""
+
+    def __init__(self, name, seconds=0.0, error=None):
+        self.name = name
+        self.seconds = seconds
+        self.error = error
+
+    def load(self):
+        time.sleep(self.seconds)
+        if self.error:
+            raise self.error
+        return [{"title": self.name, "price": 1.0, "category": "x"}]
+
+    def __repr__(self):
+        return f"SleepySource({self.name!r})"
+
+
+def errors(multi):
+    return {str(source): error for source, _, _, error in multi.report}
+
+
+def test_records_keep_source_order():
+    multi = MultiSource([SleepySource("a", 0.1), SleepySource("b"), SleepySource("c", 0.05)],
+                        workers=3)
+
+    assert [r["title"] for r in multi.load()] == ["a", "b", "c"]
+
+
+def test_failed_source_is_skipped():
+    multi = MultiSource([SleepySource("a"), SleepySource("b", error=ValueError("bad file"))])
+
+    assert [r["title"] for r in multi.load()] == ["a"]
+    assert errors(multi)["SleepySource('b')"] == "bad file"
+
+
+def test_queued_sources_behind_a_straggler_time_out():
+    # Regression: the cancelled queued sources used to crash load() with a
+    # TypeError instead of being reported
+    multi = MultiSource([SleepySource("slow", 1.0), SleepySource("b"), SleepySource("c")],
+                        workers=1, timeout=0.2)
+
+    with pytest.raises(DataSourceError, match="All 3 sources failed"):
+        multi.load()
+    assert set(errors(multi).values()) == {"timed out"}
+
+
+def test_timeout_counts_from_each_source_start():
+    # Three 0.15s sources on one worker take 0.45s in total, but none of
+    # them runs for longer than the 0.3s timeout
+    multi = MultiSource([SleepySource(name, 0.15) for name in "abc"], workers=1, timeout=0.3)
+
+    assert [r["title"] for r in multi.load()] == ["a", "b", "c"]
+    assert not any(errors(multi).values())
+
+
+def test_straggler_is_skipped_while_others_finish():
+    multi = MultiSource([SleepySource("slow", 1.0), SleepySource("b", 0.05),
+                         SleepySource("c", 0.05)], workers=2, timeout=0.3)
+
+    assert [r["title"] for r in multi.load()] == ["b", "c"]
+    assert errors(multi)["SleepySource('slow')"] == "timed out"
@@ -0,0 +1,65 @@
+"""
+Tests for the CSV importers of "3_user information.py".
+"""
+
+import sqlite3
+
+import pytest
+
+from conftest import load_script
+
+
+@pytest.fixture(scope="module")
+def importer():
+    return load_script("3_user information.py", "user_information")
+
+
+def stored_users(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return dict(conn.execute("SELECT email, name FROM users"))
+    finally:
+        conn.close()
+
+
+def test_typed_import_of_empty_csv_reports_no_data(importer, tmp_path, capsys):
+    # Regression: mmap of a zero-byte file raised ValueError
+    csv_path = tmp_path / "empty.csv"
+    csv_path.write_bytes(b"")
+
+    assert importer.import_typed_csv_to_sqlite(str(csv_path), str(tmp_path / "out.db")) is None
+    assert "CSV file is empty" in capsys.readouterr().out
+
+
+def test_typed_import_infers_column_types(importer, tmp_path):
+    csv_path = tmp_path / "scores.csv"
+    csv_path.write_text("name,score,grade\nada,91.5,1\nbob,78,2\n")
+    db_path = tmp_path / "out.db"
+
+    result = importer.import_typed_csv_to_sqlite(str(csv_path), str(db_path))
+
+    assert result["table"] == "scores"
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute("SELECT name, score, grade FROM scores ORDER BY name").fetchall() == \
+            [("ada", 91.5, 1), ("bob", 78.0, 2)]
+    finally:
+        conn.close()
+
+
+def test_parallel_import_keeps_first_duplicate(importer, tmp_path):
+    # Ranges finish in any order, but the first row in the file must win
+    # a duplicate email as in the sequential import
+    csv_path = tmp_path / "users.csv"
+    lines = ["name,email"] + [f"user{i},u{i % 500}@example.com" for i in range(3000)]
+    csv_path.write_text("\n".join(lines) + "\n")
+
+    stats = importer.parallel_import_csv_to_sqlite(str(csv_path), str(tmp_path / "p.db"),
+                                                   chunk_size=100, workers=3,
+                                                   range_bytes=2048)
+    importer.import_csv_to_sqlite(str(csv_path), str(tmp_path / "s.db"))
+
+    assert stats["inserted"] == 500 and stats["duplicates"] == 2500
+    users = stored_users(tmp_path / "p.db")
+    assert users == stored_users(tmp_path / "s.db")
+    assert users["u7@example.com"] == "user7"
@@ -2,87 +2,82 @@
 
 # license removed for brevity
 
+"""
+Patrol a waypoint route with move_base.
+
+The route comes from a YAML/CSV waypoint file (navigation/patrol.yaml by
+default) and is driven by navigation.route.RouteEngine: goals are built
+once, sent without blocking, and the next goal goes out as soon as the
+previous one finishes (or, with --tolerance, as soon as the robot is
+close enough to it).
+
+Usage:
+    python turtle2.py --cycles 3
+    python turtle2.py --waypoints stations.csv --tolerance 0.3 --dwell 2
+    python turtle2.py --waypoints stations.yaml --optimize --start dock
+"""
+
+import argparse
+
 import rospy
 import actionlib
-import time
-from move_base_msgs.msg import MoveBaseAction, MoveBaseGoal
-n = input("user input")
-needed_delay = input("enter delay")
-def movebase_client():
-    
-    client = actionlib.SimpleActionClient('move_base',MoveBaseAction)
-    client.wait_for_server()
+from move_base_msgs.msg import MoveBaseAction
+
+from navigation.planner import plan_route, route_length
+from navigation.route import RouteEngine
+from navigation.waypoints import DEFAULT_ROUTE_FILE, load_route
 
-    goal = MoveBaseGoal()
-    goal.target_pose.header.frame_id = "map"
-    goal.target_pose.header.stamp = rospy.Time.now()
-    goal.target_pose.pose.position.x= -1.58
-    goal.target_pose.pose.position.y = -0.452
-    goal.target_pose.pose.orientation.w = 0.00247
-    time.sleep(needed_delay)
-    client.send_goal(goal)
-    
-    wait = client.wait_for_result()
-    goal = MoveBaseGoal()
-    goal.target_pose.header.frame_id = "map"
-    goal.target_pose.header.stamp = rospy.Time.now()
-    goal.target_pose.pose.position.x = 1.48
-    goal.target_pose.pose.position.y =  -0.605
-    goal.target_pose.pose.orientation.w = 0.00247
-    time.sleep(needed_delay)
-    client.send_goal(goal)
-    
-    wait = client.wait_for_result()
-    goal = MoveBaseGoal()
-    goal.target_pose.header.frame_id = "map"
-    goal.target_pose.header.stamp = rospy.Time.now()
-    goal.target_pose.pose.position.x = 1.64
-    goal.target_pose.pose.position.y = 0.686
-    goal.target_pose.pose.orientation.w = 0.0025
-    time.sleep(needed_delay)
-    client.send_goal(goal)
-    
-    wait = client.wait_for_result()
-    goal = MoveBaseGoal()
-    goal.target_pose.header.frame_id = "map"
-    goal.target_pose.header.stamp = rospy.Time.now()
-    goal.target_pose.pose.position.x = -1.68
-    goal.target_pose.pose.position.y = 0.597
-    goal.target_pose.pose.orientation.w = 0.0025
-    time.sleep(needed_delay)
-    client.send_goal(goal)
-    
-    wait = client.wait_for_result()
-    goal = MoveBaseGoal()
-    goal.target_pose.header.frame_id = "map"
-    goal.target_pose.header.stamp = rospy.Time.now()
-    goal.target_pose.pose.position.x = -1.58
-    goal.target_pose.pose.position.y = -0.452
-    goal.target_pose.pose.orientation.w = 0.00247
-    time.sleep(needed_delay)
-    
-    client.send_goal(goal)
-    wait = client.wait_for_result()
-    if not wait:
+
+def movebase_client(route, cycles=1, tolerance=0.0, dwell=0.0):
+    """
+    Drive ``route`` ``cycles`` times and return the per-leg results.
+    """
+    client = actionlib.SimpleActionClient('move_base', MoveBaseAction)
+    if not client.wait_for_server(rospy.Duration(30)):
         rospy.logerr("Action server not available!")
         rospy.signal_shutdown("Action server not available!")
-    else:
-        return client.get_result()
+        return None
+
+    engine = RouteEngine(client, route, tolerance=tolerance, dwell=dwell,
+                         should_stop=rospy.is_shutdown)
+    return engine.run(cycles)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Patrol waypoints with move_base")
+    parser.add_argument("--waypoints", default=DEFAULT_ROUTE_FILE,
+                        help="YAML or CSV waypoint file (default: navigation/patrol.yaml)")
+    parser.add_argument("--cycles", type=int, default=1,
+                        help="number of patrol cycles (default: 1)")
+    parser.add_argument("--tolerance", type=float, default=0.0,
+                        help="send the next goal once within this many metres of the "
+                             "current one (default: 0 = wait for each goal)")
+    parser.add_argument("--dwell", type=float, default=0.0,
+                        help="seconds to stay at each waypoint (default: 0)")
+    parser.add_argument("--optimize", action="store_true",
+                        help="reorder the waypoints to shorten each cycle "
+                             "(nearest neighbour + 2-opt)")
+    parser.add_argument("--start", default=None,
+                        help="with --optimize, waypoint to visit first")
+    parser.add_argument("--end", default=None,
+                        help="with --optimize, waypoint to visit last (open routes only)")
+    # rospy passes remappings such as __name:=... on the command line
+    return parser.parse_args(rospy.myargv(argv)[1:] if argv is None else argv)
 
 
 if __name__ == '__main__':
+    args = parse_args()
+    route = load_route(args.waypoints)
+    if args.optimize:
+        before = route_length(route)
+        route = plan_route(route, start=args.start, end=args.end)
+        print(f"Route: {' -> '.join(w.name for w in route.legs())} "
+              f"({route_length(route):.2f} m per cycle, was {before:.2f} m)")
     try:
-      while (n>0):
-        
-         rospy.init_node('movebase_client_py')
-         result = movebase_client()
-         
-         if result:
-             print (n)
-             n = n - 1
-             rospy.loginfo("Goal execution done!")
-            
+        # Once per process: re-initializing the node per cycle is not allowed
+        rospy.init_node('movebase_client_py')
+        results = movebase_client(route, args.cycles, args.tolerance, args.dwell)
+        if results:
+            rospy.loginfo("Goal execution done!")
     except rospy.ROSInterruptException:
         rospy.loginfo("Navigation test finished.")
-
-        pass